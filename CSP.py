@@ -1,26 +1,28 @@
 # import the necessary libraries
-import gurobipy as gp 
-from gurobipy import GRB
+import argparse
+import csv
+import time
 
-# Define the data for the problem 
-officers = ['O1', 'O2', 'O3', 'O4']
-shifts = ['morning', 'evening']
+import numpy as np
 
-# Create the model
-model = gp.Model('shift_allocation')
+try:
+    import gurobipy as gp
+    from gurobipy import GRB
+except ImportError:  # the built-in min-cost-flow backend needs no solver
+    gp = None
+    GRB = None
 
-# Decision Variables - Total shifts = 10
-x = model.addVars(officers, shifts, vtype=GRB.INTEGER, name="x")
+# Define the data for the problem
+officers = ['O1', 'O2', 'O3', 'O4']
+shifts = ['morning', 'evening']
 
 # Each officer must have at least two shifts
-for officer in officers:
-    model.addConstr(x[officer, 'morning'] + x[officer, 'evening'] >= 2)
+min_shifts = {officer: 2 for officer in officers}
 
-# Morning and evening shifts must be 5 each 
-model.addConstr(gp.quicksum(x[o, 'morning'] for o in officers) == 5)
-model.addConstr(gp.quicksum(x[o, 'evening'] for o in officers) == 5)
+# Morning and evening shifts must be 5 each
+coverage = {'morning': 5, 'evening': 5}
 
-# Preferences - Soft constraints 
+# Preferences - Soft constraints
 penalty = {
     ('O1', 'morning'): 0, ('O1', 'evening'): 1,
     ('O2', 'morning'): 0, ('O2', 'evening'): 1,
@@ -28,16 +30,434 @@ penalty = {
     ('O4', 'morning'): 1, ('O4', 'evening'): 0
 }
 
-# Objective Function - Minimize the penalty
-model.setObjective(
-    gp.quicksum(x[o, s] * penalty[o, s] for o in officers for s in shifts),
-    GRB.MINIMIZE
-)
 
-# Solve 
-model.optimize()
+class ShiftAllocation:
+    """
+    Integer shift allocation: x[o, s] >= 0 shifts of type s for officer o,
+    every officer gets at least min_shifts[o], every shift type gets
+    exactly coverage[s], and the total preference penalty is minimised.
+
+    min_shifts, coverage and penalty may be dicts keyed like the data above
+    or arrays in officer/shift order.
+    """
+
+    def __init__(self, officers, shifts, min_shifts, coverage, penalty):
+        self.officers = list(officers)
+        self.shifts = list(shifts)
+        if isinstance(min_shifts, dict):
+            min_shifts = [min_shifts[o] for o in self.officers]
+        if isinstance(coverage, dict):
+            coverage = [coverage[s] for s in self.shifts]
+        if isinstance(penalty, dict):
+            penalty = [[penalty[o, s] for s in self.shifts] for o in self.officers]
+        self.min_shifts = np.asarray(min_shifts, dtype=np.int64).reshape(len(self.officers))
+        self.coverage = np.asarray(coverage, dtype=np.int64).reshape(len(self.shifts))
+        self.penalty = np.asarray(penalty, dtype=float).reshape(len(self.officers), len(self.shifts))
+
+    @classmethod
+    def from_csv(cls, officers_csv, shifts_csv, penalties_csv=None, default_penalty=0.0):
+        """
+        Load a roster from CSV files with header rows:
+
+            officers_csv   officer,min_shifts
+            shifts_csv     shift,coverage
+            penalties_csv  officer,shift,penalty   (long format; pairs not
+                                                    listed get default_penalty)
+        """
+        with open(officers_csv, newline='') as f:
+            rows = list(csv.DictReader(f))
+        officers = [row['officer'] for row in rows]
+        min_shifts = np.array([int(row['min_shifts']) for row in rows], dtype=np.int64)
+
+        with open(shifts_csv, newline='') as f:
+            rows = list(csv.DictReader(f))
+        shifts = [row['shift'] for row in rows]
+        coverage = np.array([int(row['coverage']) for row in rows], dtype=np.int64)
+
+        penalty = np.full((len(officers), len(shifts)), float(default_penalty))
+        if penalties_csv is not None:
+            officer_index = {o: i for i, o in enumerate(officers)}
+            shift_index = {s: j for j, s in enumerate(shifts)}
+            with open(penalties_csv, newline='') as f:
+                rows = list(csv.DictReader(f))
+            i = np.array([officer_index[row['officer']] for row in rows], dtype=np.intp)
+            j = np.array([shift_index[row['shift']] for row in rows], dtype=np.intp)
+            values = np.array([float(row['penalty']) for row in rows])
+            if not np.isfinite(values).all():
+                bad = rows[int(np.flatnonzero(~np.isfinite(values))[0])]
+                raise ValueError(f"Penalty for {bad['officer']}, {bad['shift']} is not a finite number")
+            penalty[i, j] = values
+        return cls(officers, shifts, min_shifts, coverage, penalty)
+
+    @classmethod
+    def from_npz(cls, filename):
+        """Load arrays saved with keys officers, shifts, min_shifts, coverage, penalty."""
+        with np.load(filename, allow_pickle=False) as data:
+            return cls(data['officers'].tolist(), data['shifts'].tolist(),
+                       data['min_shifts'], data['coverage'], data['penalty'])
+
+    def copy(self):
+        return ShiftAllocation(self.officers, self.shifts, self.min_shifts.copy(),
+                               self.coverage.copy(), self.penalty.copy())
+
+    def save_npz(self, filename):
+        np.savez(filename, officers=np.array(self.officers, dtype=str), shifts=np.array(self.shifts, dtype=str),
+                 min_shifts=self.min_shifts, coverage=self.coverage, penalty=self.penalty)
+
+
+class Schedule:
+    """
+    Solved allocation: shifts[i, j] for officer i and shift type j.
+
+    build_seconds and solve_seconds split the backend's wall-clock time
+    between setting the model up and optimizing it.
+    """
+
+    def __init__(self, problem, shifts, objective, backend, build_seconds=0.0, solve_seconds=0.0):
+        self.problem = problem
+        self.shifts = shifts
+        self.objective = objective
+        self.backend = backend
+        self.build_seconds = build_seconds
+        self.solve_seconds = solve_seconds
+
+    def __getitem__(self, key):
+        officer, shift = key
+        return self.shifts[self.problem.officers.index(officer), self.problem.shifts.index(shift)]
+
+    def as_dict(self):
+        return {(o, s): int(self.shifts[i, j])
+                for i, o in enumerate(self.problem.officers) for j, s in enumerate(self.problem.shifts)}
+
+
+# ---- Gurobi backend ----
+
+def solve_gurobi(problem):
+    if gp is None:
+        raise ImportError("gurobipy is not installed")
+    started = time.perf_counter()
+
+    # Create the model
+    model = gp.Model('shift_allocation')
+
+    # Decision Variables, one row per officer and one column per shift type
+    x = model.addMVar((len(problem.officers), len(problem.shifts)), vtype=GRB.INTEGER, lb=0, name="x")
+
+    model.addConstr(x.sum(axis=1) >= problem.min_shifts, name="min_shifts")
+    model.addConstr(x.sum(axis=0) == problem.coverage, name="coverage")
+
+    # Objective Function - Minimize the penalty
+    model.setObjective((x * problem.penalty).sum(), GRB.MINIMIZE)
+    model.update()
+    built = time.perf_counter()
+
+    # Solve
+    model.optimize()
+    solved = time.perf_counter()
+    if model.Status != GRB.OPTIMAL:
+        raise ValueError(f"Shift allocation is infeasible (Gurobi status {model.Status})")
+
+    values = np.rint(x.X).astype(np.int64)
+    return Schedule(problem, values, model.ObjVal, 'gurobi', built - started, solved - built)
+
+
+# ---- Min-cost-flow backend ----
+#
+# The constraint matrix is that of a transportation problem, so the LP
+# optimum is integral and a min-cost flow gives the same optimal penalty
+# as the integer program:
+#
+#   source -> officer o   at least min_shifts[o] units (see below)
+#   officer o -> shift s  cost penalty[o, s], uncapacitated
+#   shift s -> sink       exactly coverage[s] units
+#
+# The lower bound on source -> o is encoded by splitting the edge in two:
+# min_shifts[o] units at a cost of -BIG, the rest at cost 0. BIG exceeds
+# any penalty the flow could save elsewhere, so an optimal flow saturates
+# every forced part when a feasible allocation exists.
+
+def solve_flow(problem):
+    """Successive shortest paths, with Bellman-Ford run on whole rows/columns at once."""
+    started = time.perf_counter()
+    P = problem.penalty
+    n_officers, n_shifts = P.shape
+    total = int(problem.coverage.sum())
+    forced = problem.min_shifts.copy()    # residual of the forced source edges
+    demand = problem.coverage.copy()      # residual of the shift -> sink edges
+    flow = np.zeros((n_officers, n_shifts), dtype=np.int64)
+    if (forced < 0).any() or (demand < 0).any():
+        raise ValueError("Shift requirements must be non-negative")
+    if forced.sum() > total:
+        raise ValueError("Shift allocation is infeasible: minimum shifts exceed total coverage")
+    big = 2.0 * (np.abs(P).max(initial=0.0) + 1.0) * (total + 1)
+    # Undoing flow subtracts the penalty it added, which with fractional
+    # penalties does not land exactly on the old distance; improvements
+    # smaller than this are rounding noise and must not count.
+    eps = 1e-9 * big
+    officer_index = np.arange(n_officers)
+    shift_index = np.arange(n_shifts)
+    built = time.perf_counter()
+
+    sent = 0
+    while sent < total:
+        # Shortest paths from the source. The residual graph alternates
+        # officer -> shift (forward, cost P) and shift -> officer (undoing
+        # flow, cost -P); it has no negative cycles, so this converges
+        # within one pass per node.
+        dist_officer = np.where(forced > 0, -big, 0.0)
+        from_shift = np.full(n_officers, -1)     # -1: reached straight from the source
+        dist_shift = np.full(n_shifts, np.inf)
+        from_officer = np.full(n_shifts, -1)
+        for _ in range(n_officers + n_shifts):
+            through = dist_officer[:, None] + P
+            best = through.argmin(axis=0)
+            candidate = through[best, shift_index]
+            better = candidate < dist_shift - eps
+            dist_shift[better] = candidate[better]
+            from_officer[better] = best[better]
+
+            back = np.where(flow > 0, dist_shift[None, :] - P, np.inf)
+            best = back.argmin(axis=1)
+            candidate = back[officer_index, best]
+            improved = candidate < dist_officer - eps
+            if not improved.any():
+                break
+            dist_officer[improved] = candidate[improved]
+            from_shift[improved] = best[improved]
+
+        open_shifts = np.flatnonzero(demand > 0)
+        target = open_shifts[dist_shift[open_shifts].argmin()]
+
+        # Walk back to the source, collecting the edges and the bottleneck
+        path = []  # (officer, shift, +1 for new flow / -1 for undone flow)
+        amount = min(int(demand[target]), total - sent)
+        shift = target
+        while True:
+            officer = from_officer[shift]
+            path.append((officer, shift, 1))
+            previous = from_shift[officer]
+            if previous == -1:
+                break
+            path.append((officer, previous, -1))
+            amount = min(amount, int(flow[officer, previous]))
+            shift = previous
+        if forced[officer] > 0:
+            amount = min(amount, int(forced[officer]))
+
+        for o, s, sign in path:
+            flow[o, s] += sign * amount
+        if forced[officer] > 0:
+            forced[officer] -= amount
+        demand[target] -= amount
+        sent += amount
+
+    if forced.any():
+        raise ValueError("Shift allocation is infeasible: minimum shifts cannot all be met")
+    solved = time.perf_counter()
+    return Schedule(problem, flow, float((flow * P).sum()), 'flow', built - started, solved - built)
+
+
+BACKENDS = {'gurobi': solve_gurobi, 'flow': solve_flow}
+
+
+def solve(problem, backend='auto'):
+    """
+    Solve with the named backend. 'auto' uses Gurobi when it is installed
+    and licensed, and the min-cost-flow backend otherwise.
+    """
+    if backend != 'auto':
+        return BACKENDS[backend](problem)
+    if gp is not None:
+        try:
+            return solve_gurobi(problem)
+        except gp.GurobiError:
+            pass  # e.g. no license on this machine
+    return solve_flow(problem)
+
+
+# ---- Incremental re-solving ----
+
+class ScheduleSession:
+    """
+    Keeps a roster and, with Gurobi, its model between re-solves.
+
+    Edits are applied to the live model: a removed officer's variables get
+    an upper bound of 0 and their minimum-shift row a right-hand side of 0,
+    a new officer gets new variables added into the existing coverage rows,
+    and coverage/penalty changes only touch right-hand sides and objective
+    coefficients. Each re-solve starts from the previous assignment as a
+    MIP start.
+
+    The flow backend has no warm start: every solve() runs solve_flow() on
+    the whole edited roster, so a re-solve costs as much as the first solve
+    (tens of seconds for a few thousand officers and a hundred shifts). Use
+    Gurobi when re-solves have to be fast. self.problem always holds the
+    current roster.
+
+    As with solve(), backend='auto' falls back to the flow backend when
+    Gurobi raises an error, whether building the model or optimizing it;
+    backend='gurobi' lets the error propagate.
+    """
+
+    def __init__(self, problem, backend='auto'):
+        self.problem = problem.copy()
+        self.schedule = None
+        self._edit_seconds = 0.0
+        self._fallback = backend == 'auto'
+        if backend == 'auto':
+            backend = 'gurobi' if gp is not None else 'flow'
+        self.backend = backend
+        if backend == 'gurobi':
+            if gp is None:
+                raise ImportError("gurobipy is not installed")
+            try:
+                self._build_model()
+            except gp.GurobiError:
+                if not self._fallback:
+                    raise
+                self._use_flow()  # e.g. no license on this machine
+
+    def _use_flow(self):
+        self.backend = 'flow'
+        self.model = None
+        self._vars, self._min_rows, self._coverage = {}, {}, []
+
+    def _build_model(self):
+        started = time.perf_counter()
+        problem = self.problem
+        model = gp.Model('shift_allocation')
+        x = model.addMVar((len(problem.officers), len(problem.shifts)), vtype=GRB.INTEGER, lb=0, name="x")
+        min_rows = model.addConstr(x.sum(axis=1) >= problem.min_shifts, name="min_shifts")
+        self._coverage = model.addConstr(x.sum(axis=0) == problem.coverage, name="coverage").tolist()
+        model.setObjective((x * problem.penalty).sum(), GRB.MINIMIZE)
+        self.model = model
+        self._vars = {o: x[i] for i, o in enumerate(problem.officers)}
+        self._min_rows = {o: row for o, row in zip(problem.officers, min_rows.tolist())}
+        self._edit_seconds += time.perf_counter() - started
+
+    # ---- Deltas ----
+
+    def remove_officer(self, officer):
+        started = time.perf_counter()
+        problem = self.problem
+        i = problem.officers.index(officer)
+        del problem.officers[i]
+        problem.min_shifts = np.delete(problem.min_shifts, i)
+        problem.penalty = np.delete(problem.penalty, i, axis=0)
+        if self.backend == 'gurobi':
+            removed = self._vars.pop(officer)
+            removed.UB = 0
+            removed.Start = GRB.UNDEFINED  # their old assignment would make the MIP start infeasible
+            self._min_rows.pop(officer).RHS = 0
+        self._edit_seconds += time.perf_counter() - started
+
+    def add_officer(self, officer, min_shifts, penalty):
+        """penalty: one value per shift, as a dict or in shift order."""
+        started = time.perf_counter()
+        problem = self.problem
+        if isinstance(penalty, dict):
+            penalty = [penalty[s] for s in problem.shifts]
+        penalty = np.asarray(penalty, dtype=float).reshape(len(problem.shifts))
+        problem.officers.append(officer)
+        problem.min_shifts = np.append(problem.min_shifts, int(min_shifts))
+        problem.penalty = np.vstack([problem.penalty, penalty])
+        if self.backend == 'gurobi':
+            row = self.model.addMVar(len(problem.shifts), vtype=GRB.INTEGER, lb=0, obj=penalty, name=f"x_{officer}")
+            for constr, var in zip(self._coverage, row.tolist()):
+                self.model.chgCoeff(constr, var, 1.0)
+            self._vars[officer] = row
+            self._min_rows[officer] = self.model.addLConstr(gp.quicksum(row.tolist()), GRB.GREATER_EQUAL,
+                                                            int(min_shifts))
+        self._edit_seconds += time.perf_counter() - started
+
+    def set_coverage(self, shift, value):
+        started = time.perf_counter()
+        j = self.problem.shifts.index(shift)
+        self.problem.coverage[j] = value
+        if self.backend == 'gurobi':
+            self._coverage[j].RHS = value
+        self._edit_seconds += time.perf_counter() - started
+
+    def set_penalty(self, officer, shift, value):
+        started = time.perf_counter()
+        i, j = self.problem.officers.index(officer), self.problem.shifts.index(shift)
+        self.problem.penalty[i, j] = value
+        if self.backend == 'gurobi':
+            self._vars[officer].tolist()[j].Obj = value
+        self._edit_seconds += time.perf_counter() - started
+
+    def set_min_shifts(self, officer, value):
+        started = time.perf_counter()
+        i = self.problem.officers.index(officer)
+        self.problem.min_shifts[i] = value
+        if self.backend == 'gurobi':
+            self._min_rows[officer].RHS = value
+        self._edit_seconds += time.perf_counter() - started
+
+    # ---- Solving ----
+
+    def solve(self):
+        """Re-solve the current roster; the Schedule's solve_seconds is the re-solve time."""
+        if self.backend != 'gurobi':
+            self.schedule = solve_flow(self.problem.copy())
+            self.schedule.build_seconds += self._edit_seconds
+            self._edit_seconds = 0.0
+            return self.schedule
+
+        problem = self.problem
+        previous = self.schedule
+        if previous is not None:
+            # MIP start from last week's assignment; new officers are left to the solver
+            last = {o: row for o, row in zip(previous.problem.officers, previous.shifts)}
+            for officer in problem.officers:
+                if officer in last:
+                    self._vars[officer].Start = last[officer]
+
+        started = time.perf_counter()
+        try:
+            self.model.optimize()
+        except gp.GurobiError:
+            if not self._fallback:
+                raise
+            self._use_flow()  # e.g. the model outgrew a size-limited license
+            return self.solve()
+        solved = time.perf_counter()
+        if self.model.Status != GRB.OPTIMAL:
+            raise ValueError(f"Shift allocation is infeasible (Gurobi status {self.model.Status})")
+
+        values = np.array([np.rint(self._vars[o].X) for o in problem.officers], dtype=np.int64)
+        values = values.reshape(len(problem.officers), len(problem.shifts))
+        self.schedule = Schedule(problem.copy(), values, self.model.ObjVal, 'gurobi',
+                                 self._edit_seconds, solved - started)
+        self._edit_seconds = 0.0
+        return self.schedule
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve the shift allocation.")
+    parser.add_argument('officers_csv', nargs='?', help="officer,min_shifts (default: the built-in example)")
+    parser.add_argument('shifts_csv', nargs='?', help="shift,coverage")
+    parser.add_argument('penalties_csv', nargs='?', help="officer,shift,penalty")
+    parser.add_argument('--backend', choices=('auto',) + tuple(BACKENDS), default='auto')
+    args = parser.parse_args(argv)
+
+    if args.officers_csv is None:
+        schedule = solve(ShiftAllocation(officers, shifts, min_shifts, coverage, penalty), args.backend)
+
+        # Display the results
+        for o in officers:
+            print(f"{o}: " + ", ".join(f"{s.capitalize()} = {float(schedule[o, s])}" for s in shifts))
+        print("Total Penalty:", schedule.objective)
+        return
+
+    started = time.perf_counter()
+    problem = ShiftAllocation.from_csv(args.officers_csv, args.shifts_csv, args.penalties_csv)
+    loaded = time.perf_counter() - started
+    schedule = solve(problem, args.backend)
+    print(f"{len(problem.officers)} officers x {len(problem.shifts)} shifts, backend {schedule.backend}")
+    print(f"Load {loaded:.3f}s  build {schedule.build_seconds:.3f}s  solve {schedule.solve_seconds:.3f}s")
+    print("Total Penalty:", schedule.objective)
+
 
-# Display the results 
-for o in officers:
-    print(f"{o}: Morning = {x[o, 'morning'].X}, Evening = {x[o, 'evening'].X}")
-print("Total Penalty:", model.ObjVal)
+if __name__ == "__main__":
+    main()
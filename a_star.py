@@ -1,10 +1,18 @@
-import pygame
+import argparse
+import hashlib
+import heapq
 import math
-from queue import PriorityQueue
+import os
+import time
+from array import array
+from collections import deque
+
+from path_cache import PathCache
+
+# pygame is imported lazily by the drawing code, so the search engine below
+# can be imported and run without a display.
 
 WIDTH = 800
-WIN = pygame.display.set_mode((WIDTH, WIDTH))
-pygame.display.set_caption("A* Path Finding Algorithm")
 
 RED = (255, 0, 0)
 GREEN = (0, 255, 0)
@@ -18,6 +26,8 @@ GREY = (128, 128, 128)
 TURQUOISE = (64, 224, 208)
 
 class Spot:
+    __slots__ = ('row', 'col', 'x', 'y', 'color', 'neighbours', 'width', 'total_rows', 'grid')
+
     def __init__(self, row, col, width, total_rows):
         self.row = row
         self.col = col
@@ -27,6 +37,7 @@ class Spot:
         self.neighbours = []
         self.width = width
         self.total_rows = total_rows
+        self.grid = None  # set by make_grid; keeps neighbour lists current
 
     def get_pos(self):
         return self.row, self.col
@@ -47,27 +58,54 @@ class Spot:
         return self.color == TURQUOISE
 
     def reset(self):
-        self.color = WHITE
+        self._set_color(WHITE)
 
     def make_closed(self):
-        self.color = RED
+        self._set_color(RED)
 
     def make_open(self):
-        self.color = GREEN
+        self._set_color(GREEN)
 
     def make_barrier(self):
-        self.color = BLACK
+        self._set_color(BLACK)
 
     def make_start(self):
-        self.color = ORANGE
+        self._set_color(ORANGE)
 
     def make_end(self):
-        self.color = TURQUOISE
+        self._set_color(TURQUOISE)
 
     def make_path(self):
-        self.color = PURPLE
+        self._set_color(PURPLE)
+
+    def _set_color(self, color):
+        if color == self.color:
+            return
+        was_barrier = self.is_barrier()
+        self.color = color
+        if self.grid is not None:
+            self.grid.dirty.add(self)
+            if was_barrier != self.is_barrier():
+                self.grid.version += 1
+                # Only the four adjacent cells list this one as a neighbour.
+                for spot in self.adjacent():
+                    spot.update_neighbours(self.grid)
+                for listener in self.grid.listeners:
+                    listener(self)
+
+    def adjacent(self):
+        grid = self.grid
+        if self.row < self.total_rows - 1:
+            yield grid[self.row + 1][self.col]
+        if self.row > 0:
+            yield grid[self.row - 1][self.col]
+        if self.col < self.total_rows - 1:
+            yield grid[self.row][self.col + 1]
+        if self.col > 0:
+            yield grid[self.row][self.col - 1]
 
     def draw(self, win):
+        import pygame
         pygame.draw.rect(win, self.color, (self.x, self.y, self.width, self.width))
 
     def update_neighbours(self, grid):
@@ -95,74 +133,585 @@ def h1(p1, p2):
     return abs(x1 - x2) + abs(y1 - y2)  # Manhattan Distance
 
 
-def reconstruct_path(came_from, current, draw):
-    while current in came_from:
-        current = came_from[current]
-        current.make_path()
-        draw()
-
-
-def algorithm(draw, grid, start, end):
-    count = 0
-    open_set = PriorityQueue()
-    open_set.put((0, count, start))
+# ---- Open set ----
+
+class BucketQueue:
+    """
+    Priority queue for small non-negative integer keys, with decrease-key.
+
+    Every key has a FIFO bucket, so items with equal keys come out in
+    insertion order. Pushing an item that is already queued moves it to its
+    new bucket; the old entry is left behind and skipped when reached. A
+    cursor remembers the lowest possibly non-empty bucket, which makes push
+    and pop O(1) amortised when keys popped never decrease, as with A* on a
+    unit-cost grid under a consistent heuristic like h1.
+    """
+
+    def __init__(self):
+        self._buckets = []
+        self._entries = {}  # item -> sequence number of its live entry
+        self._sequence = 0
+        self._cursor = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, item):
+        return item in self._entries
+
+    def push(self, item, key):
+        """Insert item, or move it to key if it is already queued."""
+        buckets = self._buckets
+        while key >= len(buckets):
+            buckets.append(deque())
+        self._sequence += 1
+        self._entries[item] = self._sequence
+        buckets[key].append((self._sequence, item))
+        if key < self._cursor:
+            self._cursor = key
+
+    def pop(self):
+        """Remove and return the item with the lowest key (FIFO among ties)."""
+        entries = self._entries
+        if not entries:
+            raise IndexError("pop from an empty BucketQueue")
+        buckets = self._buckets
+        while True:
+            bucket = buckets[self._cursor]
+            while bucket:
+                sequence, item = bucket.popleft()
+                if entries.get(item) == sequence:
+                    del entries[item]
+                    return item
+            self._cursor += 1
+
+# ---- Search engine (display-free) ----
+
+def iter_search(grid, start, end):
+    """
+    Run A* from start to end over the spots' neighbour lists.
+
+    Yields progress events instead of drawing: ('open', spot) when a spot
+    enters the open set, ('closed', spot) after a spot has been expanded and
+    ('path', spot) for each spot on the way back from end to start. The
+    generator's return value is True if end was reached. Spot colors are
+    never touched, so callers decide what (if anything) to show.
+    """
+    open_set = BucketQueue()
+    open_set.push(start, h1(start.get_pos(), end.get_pos()))
     came_from = {}
 
-    g_score = {spot: float("inf") for row in grid for spot in row}
-    g_score[start] = 0
-
-    f_score = {spot: float("inf") for row in grid for spot in row}
-    f_score[start] = h1(start.get_pos(), end.get_pos())
+    # Scores are filled in as spots are reached; a missing g_score is infinity.
+    g_score = {start: 0}
+    infinity = float("inf")
 
-    open_set_hash = {start}
-
-    while not open_set.empty():
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-
-        current = open_set.get()[2]
-        open_set_hash.remove(current)
+    while open_set:
+        current = open_set.pop()
 
         if current == end:
-            reconstruct_path(came_from, end, draw)
-            end.make_end()
+            while current in came_from:
+                current = came_from[current]
+                yield 'path', current
             return True
 
         for neighbour in current.neighbours:
             temp_g_score = g_score[current] + 1
 
-            if temp_g_score < g_score[neighbour]:
+            if temp_g_score < g_score.get(neighbour, infinity):
                 came_from[neighbour] = current
                 g_score[neighbour] = temp_g_score
-                f_score[neighbour] = temp_g_score + h1(neighbour.get_pos(), end.get_pos())
-
-                if neighbour not in open_set_hash:
-                    count += 1
-                    open_set.put((f_score[neighbour], count, neighbour))
-                    open_set_hash.add(neighbour)
-                    neighbour.make_open()
 
-        draw()
+                opened = neighbour not in open_set
+                open_set.push(neighbour, temp_g_score + h1(neighbour.get_pos(), end.get_pos()))
+                if opened:
+                    yield 'open', neighbour
 
-        if current != start:
-            current.make_closed()
+        yield 'closed', current
 
     return False
 
 
+def find_path(grid, start, end, on_event=None):
+    """
+    Run the search to completion without rendering.
+
+    Returns the list of spots from start to end, or None if end is
+    unreachable. on_event, if given, is called as on_event(kind, spot) for
+    every event of iter_search.
+    """
+    events = iter_search(grid, start, end)
+    trail = []
+    while True:
+        try:
+            kind, spot = next(events)
+        except StopIteration as done:
+            found = done.value
+            break
+        if kind == 'path':
+            trail.append(spot)
+        if on_event is not None:
+            on_event(kind, spot)
+    if not found:
+        return None
+    trail.reverse()
+    trail.append(end)
+    return trail
+
+# ---- Compact grid model ----
+
+# Cell states of ArrayGrid, and the colors they are drawn with
+EMPTY, BARRIER, START, END, OPEN, CLOSED, PATH = range(7)
+STATE_COLORS = (WHITE, BLACK, ORANGE, TURQUOISE, GREEN, RED, PURPLE)
+
+
+class Cell:
+    """
+    View of one ArrayGrid cell with Spot's state methods; it owns no state.
+
+    Views are created on access and compare equal when they point at the
+    same cell. They offer row/col, get_pos(), color, the is_*() and make_*()
+    methods and draw(), but not Spot's neighbours, x, y or width, so the
+    Spot-based iter_search(), algorithm(), solve_cached() and LPAStar do not
+    accept an ArrayGrid; use its own iter_search() and find_path().
+    """
+    __slots__ = ('grid', 'index')
+
+    def __init__(self, grid, index):
+        self.grid = grid
+        self.index = index
+
+    def __eq__(self, other):
+        return isinstance(other, Cell) and self.grid is other.grid and self.index == other.index
+
+    def __hash__(self):
+        return self.index
+
+    @property
+    def row(self):
+        return self.index // self.grid.rows
+
+    @property
+    def col(self):
+        return self.index % self.grid.rows
+
+    @property
+    def color(self):
+        return STATE_COLORS[self.grid.state[self.index]]
+
+    def get_pos(self):
+        return divmod(self.index, self.grid.rows)
+
+    def is_closed(self):
+        return self.grid.state[self.index] == CLOSED
+
+    def is_open(self):
+        return self.grid.state[self.index] == OPEN
+
+    def is_barrier(self):
+        return self.grid.state[self.index] == BARRIER
+
+    def is_start(self):
+        return self.grid.state[self.index] == START
+
+    def is_end(self):
+        return self.grid.state[self.index] == END
+
+    def reset(self):
+        self.grid.state[self.index] = EMPTY
+
+    def make_closed(self):
+        self.grid.state[self.index] = CLOSED
+
+    def make_open(self):
+        self.grid.state[self.index] = OPEN
+
+    def make_barrier(self):
+        self.grid.state[self.index] = BARRIER
+
+    def make_start(self):
+        self.grid.state[self.index] = START
+
+    def make_end(self):
+        self.grid.state[self.index] = END
+
+    def make_path(self):
+        self.grid.state[self.index] = PATH
+
+    def draw(self, win):
+        import pygame
+        gap = self.grid.gap
+        row, col = self.get_pos()
+        pygame.draw.rect(win, self.color, (row * gap, col * gap, gap, gap))
+
+
+class ArrayRow:
+    """One row of an ArrayGrid; builds a Cell only for the column asked for."""
+    __slots__ = ('grid', 'base')
+
+    def __init__(self, grid, base):
+        self.grid = grid
+        self.base = base
+
+    def __len__(self):
+        return self.grid.rows
+
+    def __getitem__(self, col):
+        if not 0 <= col < self.grid.rows:
+            raise IndexError(col)
+        return Cell(self.grid, self.base + col)
+
+    def __iter__(self):
+        for index in range(self.base, self.base + self.grid.rows):
+            yield Cell(self.grid, index)
+
+
+class ArrayGrid:
+    """
+    rows x rows board kept in typed arrays instead of Spot objects.
+
+    Cell index = row * rows + col. Cell states live in a bytearray, and the
+    search's g-scores and parents in flat arrays. Scores are stamped with a
+    search generation, so a new search starts without clearing anything:
+    an entry whose stamp is older than the current search counts as unset.
+    Neighbours are derived from the state array on the fly, so barrier
+    edits cost nothing extra.
+    """
+
+    def __init__(self, rows, width=WIDTH):
+        self.rows = rows
+        self.gap = width // rows
+        n = rows * rows
+        self.state = bytearray(n)
+        self.g = array('i', bytes(4 * n))
+        self.parent = array('i', bytes(4 * n))
+        self.stamp = array('I', bytes(4 * n))
+        self.generation = 0
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, row):
+        """Lazy row, so grid[row][col] works; cell(row, col) skips the row object."""
+        if not 0 <= row < self.rows:
+            raise IndexError(row)
+        return ArrayRow(self, row * self.rows)
+
+    def __iter__(self):
+        for row in range(self.rows):
+            yield self[row]
+
+    def cell(self, row, col):
+        return Cell(self, row * self.rows + col)
+
+    def neighbours(self, index):
+        """Free cells next to index, in Spot.update_neighbours order."""
+        rows, state = self.rows, self.state
+        row, col = divmod(index, rows)
+        result = []
+        if row < rows - 1 and state[index + rows] != BARRIER:
+            result.append(index + rows)
+        if row > 0 and state[index - rows] != BARRIER:
+            result.append(index - rows)
+        if col < rows - 1 and state[index + 1] != BARRIER:
+            result.append(index + 1)
+        if col > 0 and state[index - 1] != BARRIER:
+            result.append(index - 1)
+        return result
+
+    def iter_search(self, start, end):
+        """
+        Same search and events as the module-level iter_search(), with cell
+        indices in place of spots. Accepts Cells or indices for start/end.
+        """
+        if isinstance(start, Cell):
+            start = start.index
+        if isinstance(end, Cell):
+            end = end.index
+        rows = self.rows
+        g, parent, stamp = self.g, self.parent, self.stamp
+        if self.generation == 0xFFFFFFFF:
+            stamp[:] = array('I', bytes(4 * len(stamp)))
+            self.generation = 0
+        self.generation += 1
+        generation = self.generation
+        end_row, end_col = divmod(end, rows)
+
+        open_set = BucketQueue()
+        open_set.push(start, abs(start // rows - end_row) + abs(start % rows - end_col))
+        g[start] = 0
+        parent[start] = -1
+        stamp[start] = generation
+
+        while open_set:
+            current = open_set.pop()
+
+            if current == end:
+                while parent[current] != -1:
+                    current = parent[current]
+                    yield 'path', current
+                return True
+
+            temp_g_score = g[current] + 1
+            for neighbour in self.neighbours(current):
+                if stamp[neighbour] != generation or temp_g_score < g[neighbour]:
+                    stamp[neighbour] = generation
+                    parent[neighbour] = current
+                    g[neighbour] = temp_g_score
+
+                    opened = neighbour not in open_set
+                    row, col = divmod(neighbour, rows)
+                    open_set.push(neighbour, temp_g_score + abs(row - end_row) + abs(col - end_col))
+                    if opened:
+                        yield 'open', neighbour
+
+            yield 'closed', current
+
+        return False
+
+    def find_path(self, start, end):
+        """Indices from start to end, or None if end is unreachable."""
+        events = self.iter_search(start, end)
+        trail = []
+        while True:
+            try:
+                kind, index = next(events)
+            except StopIteration as done:
+                found = done.value
+                break
+            if kind == 'path':
+                trail.append(index)
+        if not found:
+            return None
+        trail.reverse()
+        trail.append(end.index if isinstance(end, Cell) else end)
+        return trail
+
+# ---- Cached solving ----
+
+# Persisted to the file named by A_STAR_PATH_CACHE if set
+path_cache = PathCache(filename=os.environ.get('A_STAR_PATH_CACHE'))
+
+
+def solve_cached(grid, start, end, cache=None):
+    """
+    find_path() through a PathCache (path_cache by default), keyed by the
+    grid fingerprint and the start/end positions. Returns the list of spots
+    from start to end, or None if end is unreachable.
+    """
+    cache = path_cache if cache is None else cache
+    map_key = grid.fingerprint()
+    positions = cache.get(map_key, start.get_pos(), end.get_pos())
+    if positions is None:
+        path = find_path(grid, start, end)
+        positions = [spot.get_pos() for spot in path] if path else []
+        cache.put(map_key, start.get_pos(), end.get_pos(), positions)
+    if not positions:
+        return None
+    return [grid[row][col] for row, col in positions]
+
+# ---- Incremental replanning ----
+
+class LPAStar:
+    """
+    Lifelong Planning A* between a fixed start and end on a Spot grid.
+
+    Keeps g and rhs (one-step lookahead) values between runs. The planner
+    listens to its grid, so barrier edits are only queued; replan() then
+    repairs the part of the search they invalidate, instead of searching
+    from scratch. expanded counts the spots the last replan() expanded.
+    """
+
+    def __init__(self, grid, start, end):
+        self.grid = grid
+        self.start = start
+        self.end = end
+        self.g = {}
+        self.rhs = {start: 0}
+        self.expanded = 0
+        self._queue = []
+        self._open = {}  # spot -> key of its live queue entry
+        self._count = 0
+        self._changed = set()
+        self._push(start)
+        grid.listeners.append(self.notify)
+
+    def close(self):
+        """Stop listening to the grid."""
+        if self.notify in self.grid.listeners:
+            self.grid.listeners.remove(self.notify)
+
+    def notify(self, spot):
+        self._changed.add(spot)
+
+    def _key(self, spot):
+        best = min(self.g.get(spot, math.inf), self.rhs.get(spot, math.inf))
+        return best + h1(spot.get_pos(), self.end.get_pos()), best
+
+    def _push(self, spot):
+        key = self._key(spot)
+        self._count += 1
+        self._open[spot] = key
+        heapq.heappush(self._queue, (key, self._count, spot))
+
+    def _top(self):
+        queue = self._queue
+        while queue and self._open.get(queue[0][2]) != queue[0][0]:
+            heapq.heappop(queue)
+        return queue[0] if queue else None
+
+    def _update(self, spot):
+        if spot != self.start:
+            if spot.is_barrier():
+                self.rhs[spot] = math.inf
+            else:
+                g = self.g
+                self.rhs[spot] = min(g.get(other, math.inf) for other in spot.adjacent()) + 1
+        self._open.pop(spot, None)
+        if self.g.get(spot, math.inf) != self.rhs.get(spot, math.inf):
+            self._push(spot)
+
+    def replan(self):
+        """Bring the search up to date; returns the spots from start to end, or None."""
+        for spot in self._changed:
+            self._update(spot)
+        self._changed.clear()
+
+        g, rhs, end = self.g, self.rhs, self.end
+        self.expanded = 0
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            if top[0] >= self._key(end) and rhs.get(end, math.inf) == g.get(end, math.inf):
+                break
+            heapq.heappop(self._queue)
+            spot = top[2]
+            del self._open[spot]
+            self.expanded += 1
+            if g.get(spot, math.inf) > rhs.get(spot, math.inf):
+                g[spot] = rhs[spot]
+            else:
+                g[spot] = math.inf
+                self._update(spot)
+            for neighbour in spot.neighbours:
+                self._update(neighbour)
+        return self.path()
+
+    def path(self):
+        g = self.g
+        if g.get(self.end, math.inf) == math.inf:
+            return None
+        path = [self.end]
+        current = self.end
+        while current != self.start:
+            current = min(current.adjacent(), key=lambda spot: g.get(spot, math.inf))
+            path.append(current)
+        path.reverse()
+        return path
+
+# ---- Visualizer ----
+
+def algorithm(draw, grid, start, end, per_frame=1, fps=None):
+    """
+    Animate iter_search: color spots as events arrive and redraw.
+
+    By default every expansion and every path cell gets its own frame.
+    per_frame > 1 redraws after that many expansions instead, and fps runs
+    as many expansions as fit in one frame at that rate. In either batched
+    mode the path is colored in one pass and drawn once, so the solve takes
+    about as long as the headless search plus one draw per frame.
+    """
+    import pygame
+
+    batched = per_frame != 1 or fps is not None
+    budget = 1 / fps if fps else None
+
+    def frame():
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+        draw()
+
+    events = iter_search(grid, start, end)
+    expanded = 0
+    frame_started = time.perf_counter()
+    while True:
+        try:
+            kind, spot = next(events)
+        except StopIteration as done:
+            found = done.value
+            break
+
+        if kind == 'open':
+            spot.make_open()
+        elif kind == 'closed':
+            expanded += 1
+            if budget is not None:
+                due = time.perf_counter() - frame_started >= budget
+            else:
+                due = expanded >= per_frame
+            if due:
+                frame()
+                expanded = 0
+                frame_started = time.perf_counter()
+            if spot != start:
+                spot.make_closed()
+        elif kind == 'path':
+            spot.make_path()
+            if not batched:
+                frame()
+
+    if batched:
+        frame()
+    if found:
+        end.make_end()
+    return found
+
+
+class Grid(list):
+    """
+    Rows of Spots, plus the spots whose color changed since the last draw.
+
+    full_redraw is set for a fresh grid, so the first draw() paints
+    everything; after that draw() only repaints the dirty spots. version
+    counts barrier changes, and each callable in listeners is called with
+    the spot whenever one becomes or stops being a barrier.
+    """
+
+    def __init__(self, rows=()):
+        super().__init__(rows)
+        self.dirty = set()
+        self.full_redraw = True
+        self.listeners = []
+        self.version = 0
+        self._fingerprint = None  # (version, digest)
+
+    def fingerprint(self):
+        """Digest of the size and barrier layout; equal boards share it across processes."""
+        if self._fingerprint is None or self._fingerprint[0] != self.version:
+            mask = bytes(spot.is_barrier() for row in self for spot in row)
+            digest = hashlib.sha1(f"{len(self)}:".encode() + mask).hexdigest()
+            self._fingerprint = (self.version, digest)
+        return self._fingerprint[1]
+
+
 def make_grid(rows, width):
-    grid = []
+    grid = Grid()
     gap = width // rows
     for i in range(rows):
         grid.append([])
         for j in range(rows):
             spot = Spot(i, j, gap, rows)
+            spot.grid = grid
             grid[i].append(spot)
+    for row in grid:
+        for spot in row:
+            spot.update_neighbours(grid)
     return grid
 
 
 def draw_grid(win, rows, width):
+    import pygame
     gap = width // rows
     for i in range(rows):
         pygame.draw.line(win, GREY, (0, i * gap), (width, i * gap))
@@ -170,15 +719,51 @@ def draw_grid(win, rows, width):
             pygame.draw.line(win, GREY, (j * gap, 0), (j * gap, width))
 
 
-def draw(win, grid, rows, width):
-    win.fill(WHITE)
+_grid_lines = {}
+
+
+def grid_lines(rows, width):
+    """Transparent overlay with the grid lines, drawn once per board size."""
+    import pygame
+    key = (rows, width)
+    if key not in _grid_lines:
+        overlay = pygame.Surface((width, width), pygame.SRCALPHA)
+        draw_grid(overlay, rows, width)
+        _grid_lines[key] = overlay
+    return _grid_lines[key]
 
-    for row in grid:
-        for spot in row:
-            spot.draw(win)
 
-    draw_grid(win, rows, width)
-    pygame.display.update()
+def draw(win, grid, rows, width):
+    import pygame
+    dirty = getattr(grid, 'dirty', None)
+    lines = grid_lines(rows, width)
+
+    if dirty is None or grid.full_redraw:
+        win.fill(WHITE)
+
+        for row in grid:
+            for spot in row:
+                spot.draw(win)
+
+        win.blit(lines, (0, 0))
+        pygame.display.update()
+        if dirty is not None:
+            dirty.clear()
+            grid.full_redraw = False
+        return
+
+    if not dirty:
+        return
+
+    # Repaint changed cells, restore the lines over them and push only those rects.
+    rects = []
+    for spot in dirty:
+        rect = pygame.Rect(spot.x, spot.y, spot.width, spot.width)
+        spot.draw(win)
+        win.blit(lines, rect, rect)
+        rects.append(rect)
+    dirty.clear()
+    pygame.display.update(rects)
 
 
 def get_clicked_pos(pos, rows, width):
@@ -189,13 +774,23 @@ def get_clicked_pos(pos, rows, width):
     return row, col
 
 
-def main(win, width):
-    ROWS = 50
+def make_window(width=WIDTH):
+    import pygame
+    win = pygame.display.set_mode((width, width))
+    pygame.display.set_caption("A* Path Finding Algorithm")
+    return win
+
+
+def main(win, width, rows=50, per_frame=1, fps=None):
+    import pygame
+    ROWS = rows
     grid = make_grid(ROWS, width)
     start = None
     end = None
     run = True
     started = False
+    planner = None  # LPAStar kept across 'r' presses
+    shown_path = []
 
     while run:
         draw(win, grid, ROWS, width)
@@ -233,18 +828,42 @@ def main(win, width):
 
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE and start and end:
-                    for row in grid:
-                        for spot in row:
-                            spot.update_neighbours(grid)
-
-                    algorithm(lambda: draw(win, grid, ROWS, width), grid, start, end)
+                    algorithm(lambda: draw(win, grid, ROWS, width), grid, start, end, per_frame, fps)
+
+                if event.key == pygame.K_r and start and end:
+                    # Incremental replan: only repairs what the edits since the last press changed
+                    if planner is None or planner.grid is not grid or planner.start is not start \
+                            or planner.end is not end:
+                        if planner is not None:
+                            planner.close()
+                        planner = LPAStar(grid, start, end)
+                    for spot in shown_path:
+                        if spot.color == PURPLE:
+                            spot.reset()
+                    path = planner.replan()
+                    shown_path = path[1:-1] if path else []
+                    for spot in shown_path:
+                        spot.make_path()
+                    pygame.display.set_caption(f"A* Path Finding Algorithm - LPA* expanded {planner.expanded}")
 
                 if event.key == pygame.K_c:
                     start = None
                     end = None
+                    if planner is not None:
+                        planner.close()
+                        planner = None
+                    shown_path = []
                     grid = make_grid(ROWS, width)
 
     pygame.quit()
 
 
-main(WIN, WIDTH)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="A* path finding visualiser.")
+    parser.add_argument('--rows', type=int, default=50, help="cells per side")
+    parser.add_argument('--per-frame', type=int, default=1,
+                        help="expansions between redraws (1 animates every step)")
+    parser.add_argument('--fps', type=float, default=None,
+                        help="redraw at this rate, expanding as many cells as fit in a frame")
+    args = parser.parse_args()
+    main(make_window(WIDTH), WIDTH, args.rows, args.per_frame, args.fps)
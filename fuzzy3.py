@@ -1,7 +1,10 @@
 import numpy as np
 import skfuzzy as fuzz
 from skfuzzy import control as ctrl
+from skfuzzy.control.term import TermAggregate
 import random
+from concurrent.futures import ProcessPoolExecutor
+from fuzzy_pool import SimulationPool
 
 # ---- 1. Define Fuzzy Variables ----
 voltage_dev = ctrl.Antecedent(np.arange(-20, 21, 1), 'VoltageDeviation')
@@ -85,21 +88,26 @@ rules += [
 multi_ctrl = ctrl.ControlSystem(rules)
 
 # ---- 6. Simulation Utils ----
-def generate_anomaly_case():
+def generate_anomaly_case(rng=random):
     """Generate random grid scenario."""
     return (
-        random.uniform(200, 250),   # voltage
-        random.uniform(49.0, 51.0),  # frequency
-        random.uniform(0.0, 0.3),    # load imbalance
-        random.uniform(0.0, 30.0)    # phase mismatch
+        rng.uniform(200, 250),   # voltage
+        rng.uniform(49.0, 51.0),  # frequency
+        rng.uniform(0.0, 0.3),    # load imbalance
+        rng.uniform(0.0, 30.0)    # phase mismatch
     )
 
 
-def simulate_case(voltage, frequency, load, phase):
-    """Compute fuzzy outputs for a single case."""
+sim_pool = SimulationPool(multi_ctrl)
+
+
+def simulate_case(voltage, frequency, load, phase, sim=None):
+    """Compute fuzzy outputs for a single case, on a pooled simulation by default."""
+    if sim is None:
+        with sim_pool.simulation() as sim:
+            return simulate_case(voltage, frequency, load, phase, sim)
     vd = voltage - 230
     fv = frequency - 50
-    sim = ctrl.ControlSystemSimulation(multi_ctrl)
     sim.input['VoltageDeviation']   = vd
     sim.input['FrequencyVariation'] = fv
     sim.input['LoadImbalance']      = load
@@ -113,24 +121,196 @@ def simulate_case(voltage, frequency, load, phase):
     }
 
 
-def evaluate_performance(n=500):
-    """Quantify detection precision & recall over n samples."""
+def _count_outcomes(n, rng=random):
+    """Confusion counts (TP, FP, FN, TN) over n random cases, one simulation reused."""
     tp = fp = fn = tn = 0
-    for _ in range(n):
-        v, f, l, p = generate_anomaly_case()
-        out = simulate_case(v, f, l, p)
-        true_fault = abs(v - 230) > 5 or abs(f - 50) > 0.2 or l > 0.15 or p > 5
-        pred_fault = out['Severity'] > 30
-        if true_fault and pred_fault: tp += 1
-        if not true_fault and pred_fault: fp += 1
-        if true_fault and not pred_fault: fn += 1
-        if not true_fault and not pred_fault: tn += 1
+    with sim_pool.simulation() as sim:
+        for _ in range(n):
+            v, f, l, p = generate_anomaly_case(rng)
+            out = simulate_case(v, f, l, p, sim)
+            true_fault = abs(v - 230) > 5 or abs(f - 50) > 0.2 or l > 0.15 or p > 5
+            pred_fault = out['Severity'] > 30
+            if true_fault and pred_fault: tp += 1
+            if not true_fault and pred_fault: fp += 1
+            if true_fault and not pred_fault: fn += 1
+            if not true_fault and not pred_fault: tn += 1
+    return tp, fp, fn, tn
+
+
+def _count_shard(n, seed):
+    return _count_outcomes(n, random.Random(seed))
+
+
+def evaluate_performance(n=500, workers=None, seed=None):
+    """
+    Quantify detection precision & recall over n samples.
+
+    With workers > 1 the samples are split evenly across a process pool.
+    Each worker draws from its own RNG seeded from ``seed`` and reuses one
+    simulation, so a given (seed, workers) pair always gives the same counts.
+    """
+    if not workers or workers == 1:
+        rng = random if seed is None else random.Random(seed)
+        tp, fp, fn, tn = _count_outcomes(n, rng)
+    else:
+        seeds = [int(child.generate_state(1)[0])
+                 for child in np.random.SeedSequence(seed).spawn(workers)]
+        sizes = [n // workers + (i < n % workers) for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            counts = list(pool.map(_count_shard, sizes, seeds))
+        tp, fp, fn, tn = (sum(c) for c in zip(*counts))
     return {
         'TP': tp, 'FP': fp, 'FN': fn, 'TN': tn,
         'Precision': tp/(tp+fp+1e-6), 'Recall': tp/(tp+fn+1e-6)
     }
 
-# ---- 7. Main ----
+def recommend_action(severity_score):
+    """Action for a Severity output, on the same thresholds as fuzzy_code's dashboard."""
+    if severity_score >= 70:
+        return "Isolate faulty section immediately"
+    elif severity_score >= 30:
+        return "Perform dynamic load balancing"
+    else:
+        return "Monitor only"
+
+# ---- 7. Batch Inference ----
+BATCH_CHUNK = 8192
+
+
+def _term_key(term):
+    return term.parent.label, term.label
+
+
+def _fire(node, memberships, rule):
+    """Evaluate a rule antecedent tree over arrays of term memberships."""
+    if isinstance(node, TermAggregate):
+        if node.kind == 'not':
+            return 1.0 - _fire(node.term1, memberships, rule)
+        left = _fire(node.term1, memberships, rule)
+        right = _fire(node.term2, memberships, rule)
+        if node.kind == 'and':
+            return rule.and_func(left, right)
+        return rule.or_func(left, right)
+    return memberships[_term_key(node)]
+
+
+def _centroid_batch(universe, term_mfs, cuts):
+    """
+    Centroid of the clipped-and-aggregated output set for every row of cuts.
+
+    Mirrors skfuzzy's defuzzification: the universe is upsampled with the
+    points where each term's membership crosses its cut, the aggregate is
+    interpolated on that universe and its centroid integrated exactly.
+    """
+    above = term_mfs[None, :, :] >= cuts[:, :, None]     # (n, T, K)
+    crossing = above[:, :, 1:] != above[:, :, :-1]        # (n, T, K-1)
+    rows = np.arange(cuts.shape[0])[:, None]
+    terms = np.arange(cuts.shape[1])[None, :]
+
+    # One extra universe point per crossing; unused slots repeat universe[0]
+    # and only add zero-width segments.
+    extra = []
+    while crossing.any():
+        idx = crossing.argmax(axis=2)
+        hit = crossing[rows, terms, idx]
+        crossing[rows, terms, idx] = False
+        a, b = term_mfs[terms, idx], term_mfs[terms, idx + 1]
+        x_i = universe[idx]
+        dx = universe[idx + 1] - x_i
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = x_i + (cuts - a) / (b - a) * dx
+        extra.append(np.where(hit, x, universe[0]))
+
+    xs = np.broadcast_to(universe, (cuts.shape[0], universe.size))
+    if extra:
+        xs = np.concatenate([xs] + extra, axis=1)
+        xs.sort(axis=1)
+
+    seg = np.clip(np.searchsorted(universe, xs, side='right') - 1, 0, universe.size - 2)
+    frac = (xs - universe[seg]) / np.diff(universe)[seg]
+    slopes = np.diff(term_mfs, axis=1)
+    y = np.zeros_like(xs)
+    for t in range(term_mfs.shape[0]):
+        mf = term_mfs[t][seg] + frac * slopes[t][seg]
+        np.maximum(y, np.minimum(cuts[:, t][:, None], mf), out=y)
+
+    # Trapezoid area and first moment of every sub-segment, summed per row.
+    x1, x2 = xs[:, :-1], xs[:, 1:]
+    y1, y2 = y[:, :-1], y[:, 1:]
+    width = x2 - x1
+    both = y1 + y2
+    total_area = 0.5 * np.einsum('ij,ij->i', width, both)
+    total_moment = (np.einsum('ij,ij->i', width, x1 * (both + y1))
+                    + np.einsum('ij,ij->i', width, x2 * (both + y2))) / 6.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(total_area > 0, total_moment / total_area, np.nan)
+
+
+def _simulate_chunk(inputs):
+    memberships = {}
+    for antecedent in multi_ctrl.antecedents:
+        universe = antecedent.universe.astype(float)
+        values = np.clip(inputs[antecedent.label], universe[0], universe[-1])
+        for label, term in antecedent.terms.items():
+            memberships[antecedent.label, label] = np.interp(values, universe, term.mf)
+
+    activations = {}
+    for rule in multi_ctrl.rules:
+        firing = _fire(rule.antecedent, memberships, rule)
+        for weighted in rule.consequent:
+            key = _term_key(weighted.term)
+            value = firing * weighted.weight
+            if key in activations:
+                value = weighted.term.parent.accumulation_method(value, activations[key])
+            activations[key] = value
+
+    n = len(inputs['VoltageDeviation'])
+    outputs = {}
+    for consequent in multi_ctrl.consequents:
+        terms = list(consequent.terms.values())
+        term_mfs = np.array([term.mf for term in terms], dtype=float)
+        cuts = np.column_stack([
+            np.broadcast_to(activations.get(_term_key(term), 0.0), (n,))
+            for term in terms
+        ])
+        outputs[consequent.label] = _centroid_batch(
+            consequent.universe.astype(float), term_mfs, cuts)
+    return outputs
+
+
+def simulate_batch(voltages, frequencies, loads, phases, chunk_size=BATCH_CHUNK):
+    """
+    Compute fuzzy outputs for many cases at once.
+
+    Evaluates the same rule base as ``simulate_case`` with NumPy arrays
+    instead of one ControlSystemSimulation per reading. Returns a dict of
+    arrays keyed like ``simulate_case``; readings for which no rule fires on
+    an output get NaN there (the scalar path raises instead).
+    """
+    voltages, frequencies, loads, phases = np.broadcast_arrays(
+        np.asarray(voltages, dtype=float), np.asarray(frequencies, dtype=float),
+        np.asarray(loads, dtype=float), np.asarray(phases, dtype=float))
+    shape = voltages.shape
+    columns = {
+        'VoltageDeviation':   voltages.ravel() - 230,
+        'FrequencyVariation': frequencies.ravel() - 50,
+        'LoadImbalance':      loads.ravel(),
+        'PhaseMismatch':      phases.ravel(),
+    }
+    total = voltages.size
+    results = {c.label: np.empty(total) for c in multi_ctrl.consequents}
+    for lo in range(0, total, chunk_size):
+        chunk = {k: v[lo:lo + chunk_size] for k, v in columns.items()}
+        for label, values in _simulate_chunk(chunk).items():
+            results[label][lo:lo + chunk_size] = values
+    return {
+        'Severity':        results['Severity'].reshape(shape),
+        'LoadBalance':     results['LoadBalance'].reshape(shape),
+        'PFCorrection':    results['PFCorrection'].reshape(shape),
+        'StorageDispatch': results['StorageDispatch'].reshape(shape)
+    }
+
+# ---- 8. Main ----
 if __name__ == "__main__":
     v, f, l, p = generate_anomaly_case()
     results = simulate_case(v, f, l, p)
@@ -1,12 +1,18 @@
 # smart_grid_fuzzy_visual_ui.py
 
+import argparse
+import hashlib
+import os
+import threading
 import numpy as np
 import skfuzzy as fuzz
 from skfuzzy import control as ctrl
+from skfuzzy.control.controlsystem import CrispValueCalculator
 import random
 import tkinter as tk
 from tkinter import messagebox
 import matplotlib.pyplot as plt
+from fuzzy_pool import SimulationPool
 
 # ---- Define Fuzzy Variables ----
 
@@ -47,7 +53,234 @@ rules = [
 ]
 
 fault_ctrl = ctrl.ControlSystem(rules)
-fault_detector = ctrl.ControlSystemSimulation(fault_ctrl)
+detector_pool = SimulationPool(fault_ctrl)  # safe to share between threads
+
+
+def _run_detector(sim, voltage_dev, freq_var, load):
+    sim.input['Voltage Deviation'] = voltage_dev
+    sim.input['Frequency Variation'] = freq_var
+    sim.input['Load Imbalance'] = load
+    sim.compute()
+    return sim.output.get('Fault Severity', 0.0)
+
+
+def compute_severity(voltage_dev, freq_var, load):
+    """Run the full fuzzy pipeline once; 0 when no rule fires."""
+    with detector_pool.simulation() as sim:
+        return _run_detector(sim, voltage_dev, freq_var, load)
+
+
+def severity_moments(voltage_dev, freq_var, load):
+    """
+    Area and first moment of the aggregated output set.
+
+    Their ratio is the centroid compute() returns, but unlike the centroid
+    both vary continuously with the inputs, so they interpolate well.
+    """
+    with detector_pool.simulation() as sim:
+        # compute() clears all per-input state every flush_after_run runs,
+        # including the memberships read below, so reset() one run early.
+        # The run counters are private (checked against scikit-fuzzy 0.5);
+        # resetting before every run is the public route but makes each
+        # call about 50% slower, so it is only the fallback.
+        run, flush = getattr(sim, '_run', None), getattr(sim, '_flush_after_run', None)
+        if run is None or flush is None or (run + 1) % flush == 0:
+            sim.reset()
+        _run_detector(sim, voltage_dev, freq_var, load)
+        severity = next(c for c in sim.ctrl.consequents if c.label == fault_severity.label)
+        x, y, _ = CrispValueCalculator(severity, sim).find_memberships()
+    x1, x2, y1, y2 = x[:-1], x[1:], y[:-1], y[1:]
+    width = x2 - x1
+    area = 0.5 * width * (y1 + y2)
+    moment = area * x1 + width * width * (y1 + 2.0 * y2) / 6.0
+    return area.sum(), moment.sum()
+
+# ---- Precompiled Lookup Table ----
+
+LUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fault_severity_lut.npz')
+LUT_INPUTS = (voltage_deviation, frequency_variation, load_imbalance)
+LUT_SHAPE = tuple(len(var.universe) for var in LUT_INPUTS)  # one sample per universe point
+
+
+def _rulebase_signature():
+    """Hash of universes, membership functions and rules, to detect stale tables."""
+    digest = hashlib.sha1()
+    for var in LUT_INPUTS + (fault_severity,):
+        digest.update(np.asarray(var.universe, dtype=float).tobytes())
+        for label, term in var.terms.items():
+            digest.update(label.encode())
+            digest.update(np.asarray(term.mf, dtype=float).tobytes())
+    for rule in rules:
+        digest.update(str(rule).encode())
+    return digest.hexdigest()
+
+
+def _sample_moments(shape, midpoints=False, known=None):
+    """
+    severity_moments() on a regular grid over the input universes, or at the
+    centres of the cells of a grid with shape + 1 points when midpoints is set.
+
+    known maps an index offset to values already sampled on every second
+    point from that offset, e.g. {(0, 0, 0): coarse_table} for a grid of
+    2 * n - 1 points per axis; only the remaining points are sampled.
+    """
+    if midpoints:
+        axes = [var.universe[0] + (np.arange(n) + 0.5) * (var.universe[-1] - var.universe[0]) / n
+                for var, n in zip(LUT_INPUTS, shape)]
+    else:
+        axes = [np.linspace(var.universe[0], var.universe[-1], n) for var, n in zip(LUT_INPUTS, shape)]
+    table = np.full(shape + (2,), np.nan)
+    for (a, b, c), values in (known or {}).items():
+        table[a::2, b::2, c::2] = values
+    for i, j, k in zip(*np.nonzero(np.isnan(table[..., 0]))):
+        table[i, j, k] = severity_moments(axes[0][i], axes[1][j], axes[2][k])
+    return table
+
+
+class SeverityLUT:
+    """
+    Fault severity precomputed on a regular 3-D grid over the input universes.
+
+    The table holds the area and moment of the aggregated output set at each
+    grid point. Queries interpolate both trilinearly and return their ratio,
+    which stays accurate next to the edges where rules stop firing (the
+    centroid itself jumps there). Inputs are clipped to the universes just
+    like the skfuzzy simulation does.
+    """
+
+    def __init__(self, table, max_error=None, signature=None):
+        self.table = np.asarray(table, dtype=float)
+        self.max_error = max_error
+        self.signature = signature
+        self.lows = [float(var.universe[0]) for var in LUT_INPUTS]
+        self.highs = [float(var.universe[-1]) for var in LUT_INPUTS]
+        self.shape = self.table.shape[:3]
+        self.scales = [(n - 1) / (hi - lo) for n, lo, hi in zip(self.shape, self.lows, self.highs)]
+        self._areas = self.table[..., 0].ravel().tolist()
+        self._moments = self.table[..., 1].ravel().tolist()
+
+    @classmethod
+    def compile(cls, shape=LUT_SHAPE, max_error=None, max_refinements=2):
+        """
+        Sample the control surface once per grid point.
+
+        The table is then checked against the exact centroid at the midpoint
+        of every grid cell, where trilinear interpolation is furthest from
+        the samples, and the worst error is kept as max_error. If a bound is
+        given and not met, the grid is refined to double resolution (the old
+        points and midpoints are reused) up to max_refinements times, and
+        ValueError is raised if it still is not met.
+
+        This runs the fuzzy pipeline about twice per grid point and takes a
+        few minutes at the default shape; see `python fuzzy_code.py --compile-lut`.
+        """
+        table = _sample_moments(shape)
+        for refinement in range(max_refinements + 1):
+            lut = cls(table, signature=_rulebase_signature())
+            midpoints = _sample_moments(tuple(n - 1 for n in shape), midpoints=True)
+            area, moment = midpoints[..., 0], midpoints[..., 1]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                expected = np.where(area > 0, moment / area, 0.0)
+            axes = [lo + (np.arange(n - 1) + 0.5) * (hi - lo) / (n - 1)
+                    for lo, hi, n in zip(lut.lows, lut.highs, shape)]
+            actual = lut.query_many(*np.meshgrid(*axes, indexing='ij'))
+            lut.max_error = float(np.max(np.abs(actual - expected)))
+            if max_error is None or lut.max_error <= max_error:
+                return lut
+            if refinement == max_refinements:
+                break
+            shape = tuple(2 * n - 1 for n in shape)
+            table = _sample_moments(shape, known={(0, 0, 0): table, (1, 1, 1): midpoints})
+        raise ValueError(f"Lookup table error {lut.max_error:.3g} at shape {shape} exceeds "
+                         f"max_error={max_error} after {max_refinements} refinements")
+
+    def save(self, path=LUT_PATH):
+        np.savez_compressed(path, table=self.table,
+                            max_error=np.nan if self.max_error is None else self.max_error,
+                            signature=self.signature or '')
+
+    @classmethod
+    def load(cls, path=LUT_PATH):
+        with np.load(path) as data:
+            max_error = float(data['max_error'])
+            return cls(data['table'],
+                       max_error=None if np.isnan(max_error) else max_error,
+                       signature=str(data['signature']) or None)
+
+    def __call__(self, voltage_dev, freq_var, load):
+        """Interpolated severity for a single reading (pure Python fast path)."""
+        (lx, ly, lz), (hx, hy, hz), (kx, ky, kz) = self.lows, self.highs, self.scales
+        nx, ny, nz = self.shape
+        x = (min(max(voltage_dev, lx), hx) - lx) * kx
+        y = (min(max(freq_var, ly), hy) - ly) * ky
+        z = (min(max(load, lz), hz) - lz) * kz
+        i, j, k = min(int(x), nx - 2), min(int(y), ny - 2), min(int(z), nz - 2)
+        tx, ty, tz = x - i, y - j, z - k
+        sx, sy, sz = 1.0 - tx, 1.0 - ty, 1.0 - tz
+
+        b00 = (i * ny + j) * nz + k
+        b01 = b00 + nz
+        b10 = b00 + ny * nz
+        b11 = b10 + nz
+        w00, w01, w10, w11 = sx * sy, sx * ty, tx * sy, tx * ty
+
+        a, m = self._areas, self._moments
+        area = (w00 * (sz * a[b00] + tz * a[b00 + 1]) + w01 * (sz * a[b01] + tz * a[b01 + 1])
+                + w10 * (sz * a[b10] + tz * a[b10 + 1]) + w11 * (sz * a[b11] + tz * a[b11 + 1]))
+        if area <= 0:
+            return 0.0
+        moment = (w00 * (sz * m[b00] + tz * m[b00 + 1]) + w01 * (sz * m[b01] + tz * m[b01 + 1])
+                  + w10 * (sz * m[b10] + tz * m[b10 + 1]) + w11 * (sz * m[b11] + tz * m[b11 + 1]))
+        return moment / area
+
+    def query_many(self, voltage_dev, freq_var, load):
+        """Vectorised version of calling the table, over broadcastable arrays."""
+        values = np.broadcast_arrays(np.asarray(voltage_dev, dtype=float),
+                                     np.asarray(freq_var, dtype=float),
+                                     np.asarray(load, dtype=float))
+        idx, frac = [], []
+        for value, lo, hi, scale, n in zip(values, self.lows, self.highs, self.scales, self.shape):
+            x = (np.clip(value, lo, hi) - lo) * scale
+            i = np.minimum(x.astype(int), n - 2)
+            idx.append(i)
+            frac.append((x - i)[..., None])
+        (i, j, k), (tx, ty, tz) = idx, frac
+
+        t = self.table
+        c00 = t[i, j, k] + (t[i, j, k + 1] - t[i, j, k]) * tz
+        c01 = t[i, j + 1, k] + (t[i, j + 1, k + 1] - t[i, j + 1, k]) * tz
+        c10 = t[i + 1, j, k] + (t[i + 1, j, k + 1] - t[i + 1, j, k]) * tz
+        c11 = t[i + 1, j + 1, k] + (t[i + 1, j + 1, k + 1] - t[i + 1, j + 1, k]) * tz
+        c0 = c00 + (c01 - c00) * ty
+        c1 = c10 + (c11 - c10) * ty
+        area, moment = np.moveaxis(c0 + (c1 - c0) * tx, -1, 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(area > 0, moment / area, 0.0)
+
+
+_lut = None
+_lut_lock = threading.Lock()
+
+
+def _lut_fits(lut, max_error):
+    return (lut is not None and lut.signature == _rulebase_signature()
+            and (max_error is None or (lut.max_error is not None and lut.max_error <= max_error)))
+
+
+def get_lut(path=LUT_PATH, max_error=None):
+    """
+    Load the persisted table, compiling and saving it if missing, stale or
+    less accurate than max_error. Compiling blocks for minutes.
+    """
+    global _lut
+    with _lut_lock:
+        if not _lut_fits(_lut, max_error):
+            lut = SeverityLUT.load(path) if os.path.exists(path) else None
+            if not _lut_fits(lut, max_error):
+                lut = SeverityLUT.compile(max_error=max_error)
+                lut.save(path)
+            _lut = lut
+    return _lut
 
 # ---- Simulate Grid Data ----
 
@@ -59,6 +292,15 @@ def generate_anomaly_case():
 
 # ---- UI Functions ----
 
+def recommend_action(severity_score):
+    # Determine action based on severity
+    if severity_score >= 70:
+        return "Isolate faulty section immediately"
+    elif severity_score >= 30:
+        return "Perform dynamic load balancing"
+    else:
+        return "Monitor only"
+
 def detect_and_display():
     voltage, frequency, load = generate_anomaly_case()
 
@@ -66,21 +308,15 @@ def detect_and_display():
     voltage_dev = voltage - 230    # Assuming 230V is nominal
     freq_var = frequency - 50.0    # Assuming 50Hz is nominal
 
-    # Pass to fuzzy controller
-    fault_detector.input['Voltage Deviation'] = voltage_dev
-    fault_detector.input['Frequency Variation'] = freq_var
-    fault_detector.input['Load Imbalance'] = load
-    fault_detector.compute()
-
-    severity_score = fault_detector.output['Fault Severity']
-
-    # Determine action based on severity
-    if severity_score >= 70:
-        action = "Isolate faulty section immediately"
-    elif severity_score >= 30:
-        action = "Perform dynamic load balancing"
+    # Look up the precompiled fuzzy control surface; run the full pipeline
+    # while the table is still being compiled in the background
+    lut = _lut
+    if lut is not None:
+        severity_score = lut(voltage_dev, freq_var, load)
     else:
-        action = "Monitor only"
+        severity_score = compute_severity(voltage_dev, freq_var, load)
+
+    action = recommend_action(severity_score)
 
     # Update UI Labels
     voltage_label.config(text=f"Voltage: {voltage:.2f}V (Deviation: {voltage_dev:+.2f}V)")
@@ -109,15 +345,13 @@ def plot_decision_surface():
     x = np.arange(-20, 21, 2)
     y = np.arange(-1, 1.1, 0.2)
     X, Y = np.meshgrid(x, y)
-    Z = np.zeros_like(X)
-
-    for i in range(X.shape[0]):
-        for j in range(X.shape[1]):
-            fault_detector.input['Voltage Deviation'] = X[i, j]
-            fault_detector.input['Frequency Variation'] = Y[i, j]
-            fault_detector.input['Load Imbalance'] = 0.15  # Mid value
-            fault_detector.compute()
-            Z[i, j] = fault_detector.output['Fault Severity']
+    # Load imbalance fixed at mid value. Until the background compile is
+    # done, evaluate the 231 points directly rather than wait for the table.
+    lut = _lut
+    if lut is not None:
+        Z = lut.query_many(X, Y, 0.15)
+    else:
+        Z = np.vectorize(compute_severity)(X, Y, 0.15)
 
     fig = plt.figure()
     ax = fig.add_subplot(111, projection='3d')
@@ -133,6 +367,10 @@ def plot_decision_surface():
 def run_dashboard():
     global voltage_label, frequency_label, load_label, severity_label, action_label
 
+    # Loading the lookup table is quick, but compiling it takes minutes; do
+    # that off the UI thread (or ahead of time with --compile-lut)
+    threading.Thread(target=get_lut, daemon=True).start()
+
     window = tk.Tk()
     window.title("Smart Grid Fuzzy Monitoring System")
 
@@ -171,4 +409,15 @@ def run_dashboard():
 # ---- Main ----
 
 if __name__ == "__main__":
-    run_dashboard()
+    parser = argparse.ArgumentParser(description="Smart grid fuzzy monitoring dashboard.")
+    parser.add_argument('--compile-lut', action='store_true',
+                        help=f"compile the severity lookup table to {os.path.basename(LUT_PATH)} and exit")
+    parser.add_argument('--max-error', type=float, default=None,
+                        help="refine the table until its worst interpolation error is within this")
+    args = parser.parse_args()
+    if args.compile_lut:
+        lut = SeverityLUT.compile(max_error=args.max_error)
+        lut.save()
+        print(f"Compiled {'x'.join(map(str, lut.shape))} table, max error {lut.max_error:.3f}")
+    else:
+        run_dashboard()
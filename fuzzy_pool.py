@@ -0,0 +1,131 @@
+# fuzzy_pool.py
+#
+# Thread-safe pool of scikit-fuzzy simulations.
+#
+# A ControlSystemSimulation keeps its intermediate results on the Terms of
+# its ControlSystem, keyed by the current inputs, and periodically clears
+# them. Two simulations built on the same ControlSystem therefore still
+# share state, so every pooled simulation gets its own deep copy of the
+# control system. The copies are made once, when a slot is first needed.
+
+import copy
+import threading
+from contextlib import contextmanager
+
+from skfuzzy import control as ctrl
+
+
+class SimulationPool:
+    """
+    Bounded pool of independent ControlSystemSimulation objects.
+
+    checkout() hands a simulation to one thread at a time and checkin()
+    returns it. A thread gets back the simulation it used last whenever that
+    one is idle, so in steady state each thread keeps a warm simulation of
+    its own. When all max_size simulations are in use, checkout() blocks.
+    """
+
+    def __init__(self, control_system, max_size=8, **sim_kwargs):
+        self.control_system = control_system
+        self.max_size = max_size
+        self.sim_kwargs = sim_kwargs
+        self.created = 0
+        self._idle = {}                 # id(sim) -> sim, most recently returned last
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+    def _new_simulation(self):
+        return ctrl.ControlSystemSimulation(copy.deepcopy(self.control_system), **self.sim_kwargs)
+
+    def checkout(self, timeout=None):
+        """Take a simulation out of the pool; raises TimeoutError if none frees up in time."""
+        preferred = getattr(self._local, 'sim', None)
+        with self._cond:
+            while True:
+                if preferred is not None and id(preferred) in self._idle:
+                    return self._idle.pop(id(preferred))
+                if self._idle:
+                    sim = self._idle.popitem()[1]
+                    self._local.sim = sim
+                    return sim
+                if self.created < self.max_size:
+                    self.created += 1
+                    break
+                if not self._cond.wait(timeout):
+                    raise TimeoutError("No simulation became available")
+        # Build outside the lock; deep-copying the rule graph takes a moment.
+        sim = self._new_simulation()
+        self._local.sim = sim
+        return sim
+
+    def checkin(self, sim):
+        """Return a simulation obtained from checkout()."""
+        with self._cond:
+            self._idle[id(sim)] = sim
+            self._cond.notify()
+
+    @contextmanager
+    def simulation(self, timeout=None):
+        sim = self.checkout(timeout)
+        try:
+            yield sim
+        finally:
+            self.checkin(sim)
+
+
+# ---- Microbenchmark ----
+
+def benchmark(n=300, threads=4):
+    """Compare building a simulation per call against reusing pooled ones."""
+    import time
+    import tracemalloc
+    from concurrent.futures import ThreadPoolExecutor
+
+    import fuzzy3
+
+    pool = SimulationPool(fuzzy3.multi_ctrl, max_size=threads)
+
+    def per_call(case):
+        fuzzy3.simulate_case(*case, sim=ctrl.ControlSystemSimulation(fuzzy3.multi_ctrl))
+
+    def pooled(case):
+        with pool.simulation() as sim:
+            fuzzy3.simulate_case(*case, sim=sim)
+
+    # Fresh cases for every pass: simulations cache results by input.
+    def fresh_cases():
+        return [fuzzy3.generate_anomaly_case() for _ in range(n)]
+
+    results = {}
+    for name, fn in (('per-call', per_call), ('pool', pooled)):
+        cases = fresh_cases()
+        started = time.perf_counter()
+        for case in cases:
+            fn(case)
+        elapsed = time.perf_counter() - started
+
+        cases = fresh_cases()
+        tracemalloc.start()
+        for case in cases:
+            fn(case)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = {'ms_per_call': 1000 * elapsed / n, 'peak_kib': peak / 1024}
+    results['per-call']['simulations'] = 2 * n
+    results['pool']['simulations'] = pool.created
+
+    # Per-call simulations on one control system race on shared state, so
+    # only the pool is exercised from several threads.
+    cases = fresh_cases()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        list(executor.map(pooled, cases))
+    results[f'pool x{threads}'] = {'ms_per_call': 1000 * (time.perf_counter() - started) / n,
+                                   'peak_kib': float('nan'), 'simulations': pool.created}
+    return results
+
+
+if __name__ == "__main__":
+    for name, row in benchmark().items():
+        print(f"{name:9} {row['ms_per_call']:6.2f} ms/call  peak {row['peak_kib']:8.0f} KiB  "
+              f"simulations built {row['simulations']}")
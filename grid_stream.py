@@ -0,0 +1,180 @@
+# grid_stream.py
+#
+# Streaming anomaly scoring for grid telemetry. Records are read in
+# fixed-size chunks, scored through one of the fuzzy rule bases and written
+# out incrementally, so memory stays bounded whatever the input size.
+#
+#   python grid_stream.py fuzzy3 telemetry.csv -o scores.csv
+#   cat telemetry.bin | python grid_stream.py fuzzy_code - --format bin
+
+import argparse
+import importlib
+import itertools
+import sys
+import time
+
+import numpy as np
+
+# voltage (V), frequency (Hz), load imbalance (0-0.3), phase mismatch (deg)
+FIELDS = ('voltage', 'frequency', 'load', 'phase')
+RECORD_DTYPE = np.dtype('<f8')  # binary records are 4 little-endian float64s
+DEFAULT_CHUNK = 65536
+
+# ---- Readers ----
+
+def _is_number(text):
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def iter_csv_chunks(stream, chunk_size=DEFAULT_CHUNK, require_phase=False):
+    """Yield (n, 4) float arrays from CSV text; a header row is skipped.
+
+    Rows may omit the phase column, in which case it reads as 0, unless
+    require_phase is set; then a missing phase column is a ValueError.
+    """
+    first = stream.readline()
+    if not first:
+        return
+    lines = iter([first]) if _is_number(first.split(',')[0]) else iter(())
+    lines = itertools.chain(lines, stream)
+    while True:
+        block = [line for line in itertools.islice(lines, chunk_size) if line.strip()]
+        if not block:
+            return
+        data = np.loadtxt(block, delimiter=',', dtype=float, ndmin=2)
+        if data.shape[1] < len(FIELDS):
+            if require_phase and data.shape[1] == len(FIELDS) - 1:
+                raise ValueError("CSV input has no phase column, which this model needs")
+            padding = np.zeros((len(data), len(FIELDS) - data.shape[1]))
+            data = np.hstack([data, padding])
+        yield data[:, :len(FIELDS)]
+
+
+def iter_binary_chunks(stream, chunk_size=DEFAULT_CHUNK):
+    """Yield (n, 4) float arrays from packed float64 records."""
+    record_size = RECORD_DTYPE.itemsize * len(FIELDS)
+    while True:
+        raw = stream.read(chunk_size * record_size)
+        if not raw:
+            return
+        while len(raw) % record_size:
+            more = stream.read(record_size - len(raw) % record_size)
+            if not more:
+                raise ValueError("Binary input ends with a partial record")
+            raw += more
+        yield np.frombuffer(raw, dtype=RECORD_DTYPE).reshape(-1, len(FIELDS))
+
+# ---- Scorers ----
+# Each scorer takes an (n, 4) chunk and returns output columns of length n.
+
+def _score_fuzzy(chunk):
+    fuzzy = importlib.import_module('fuzzy')
+    severities, actions = [], []
+    for voltage, frequency, load, _ in chunk.tolist():
+        severity = fuzzy.apply_fuzzy_rules(fuzzy.fuzzify_voltage(voltage),
+                                           fuzzy.fuzzify_frequency(frequency),
+                                           fuzzy.fuzzify_load(load))
+        severities.append(severity)
+        actions.append(fuzzy.decide_action(severity))
+    return {'severity': severities, 'action': actions}
+
+
+def _score_fuzzy_code(chunk):
+    fuzzy_code = importlib.import_module('fuzzy_code')
+    severity = fuzzy_code.get_lut().query_many(chunk[:, 0] - 230, chunk[:, 1] - 50.0, chunk[:, 2])
+    return {
+        'severity': [f"{value:.2f}" for value in severity.tolist()],
+        'action': [fuzzy_code.recommend_action(value) for value in severity.tolist()],
+    }
+
+
+def _score_fuzzy3(chunk):
+    fuzzy3 = importlib.import_module('fuzzy3')
+    out = fuzzy3.simulate_batch(chunk[:, 0], chunk[:, 1], chunk[:, 2], chunk[:, 3])
+    return {
+        'severity': [f"{value:.2f}" for value in out['Severity'].tolist()],
+        'action': [fuzzy3.recommend_action(value) for value in out['Severity'].tolist()],
+        'load_balance': [f"{value:.2f}" for value in out['LoadBalance'].tolist()],
+        'pf_correction': [f"{value:.2f}" for value in out['PFCorrection'].tolist()],
+        'storage_dispatch': [f"{value:.2f}" for value in out['StorageDispatch'].tolist()],
+    }
+
+
+SCORERS = {
+    'fuzzy': _score_fuzzy,
+    'fuzzy_code': _score_fuzzy_code,
+    'fuzzy3': _score_fuzzy3,
+}
+
+# Modules each scorer imports, loaded before timing starts
+SCORER_MODULES = {
+    'fuzzy': ('fuzzy',),
+    'fuzzy_code': ('fuzzy_code',),
+    'fuzzy3': ('fuzzy3',),
+}
+
+# Models that score the phase mismatch column
+PHASE_MODELS = {'fuzzy3'}
+
+# ---- Pipeline ----
+
+def stream_scores(model, source, sink, fmt='csv', chunk_size=DEFAULT_CHUNK):
+    """Score every record from source and write CSV rows to sink.
+
+    Returns (rows, seconds).
+    """
+    scorer = SCORERS[model]
+    for name in SCORER_MODULES[model]:
+        importlib.import_module(name)
+    if fmt == 'bin':
+        chunks = iter_binary_chunks(source, chunk_size)
+    else:
+        chunks = iter_csv_chunks(source, chunk_size, require_phase=model in PHASE_MODELS)
+    rows = 0
+    header_written = False
+    started = time.perf_counter()
+    for chunk in chunks:
+        columns = scorer(chunk)
+        if not header_written:
+            sink.write(','.join(columns) + '\n')
+            header_written = True
+        sink.write(''.join(','.join(row) + '\n' for row in zip(*columns.values())))
+        rows += len(chunk)
+    return rows, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream grid telemetry through a fuzzy anomaly detector.")
+    parser.add_argument('model', choices=sorted(SCORERS))
+    parser.add_argument('input', nargs='?', default='-', help="CSV/binary file, or - for stdin")
+    parser.add_argument('-o', '--output', default='-', help="CSV output file, or - for stdout")
+    parser.add_argument('--format', choices=('csv', 'bin'), default='csv')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK)
+    args = parser.parse_args(argv)
+
+    if args.input == '-':
+        source = sys.stdin.buffer if args.format == 'bin' else sys.stdin
+    elif args.format == 'bin':
+        source = open(args.input, 'rb')
+    else:
+        source = open(args.input, newline='')
+    sink = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+
+    try:
+        rows, seconds = stream_scores(args.model, source, sink, args.format, args.chunk_size)
+    finally:
+        if source not in (sys.stdin, sys.stdin.buffer):
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    rate = rows / seconds if seconds > 0 else float('inf')
+    print(f"Scored {rows} rows in {seconds:.2f}s ({rate:,.0f} rows/sec)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# maze_bench.py
+#
+# Benchmark harness for the maze searches. Mazes are generated from a seed,
+# so runs are reproducible, and spread over a process pool one maze per
+# task. Every algorithm solves the same mazes. Reports wall-clock latency
+# percentiles, expanded nodes, peak traced memory and path cost per
+# algorithm, grid size and barrier density.
+#
+#   python maze_bench.py --sizes 100 300x200 --densities 0.1 0.3 --mazes 20
+#   python maze_bench.py --algorithms astar jps --json results.json --csv results.csv
+
+import argparse
+import csv
+import json
+import math
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import maze
+
+# name -> search(start, goal, grid) returning (visited_order, _, path)
+ALGORITHMS = {
+    'ucs': maze.uniform_cost_search,
+    'astar': maze.a_star_search,
+    'astar-octile': lambda start, goal, grid: maze.a_star_search(start, goal, grid, 'octile'),
+    'jps': maze.jps_search,
+    'bidir-ucs': maze.bidirectional_uniform_cost_search,
+    'bidir-astar': maze.bidirectional_a_star_search,
+    'array-ucs': maze.uniform_cost_search_array,
+    'array-astar': maze.a_star_search_array,
+}
+
+FIELDS = ('algorithm', 'rows', 'cols', 'density', 'mazes', 'solved',
+          'p50_ms', 'p95_ms', 'p99_ms', 'mean_ms', 'mean_expanded', 'peak_kib', 'mean_path_cost')
+
+
+def parse_size(text):
+    """'200' -> (200, 200); '300x200' -> (300, 200) as rows x cols."""
+    rows, _, cols = text.lower().partition('x')
+    return int(rows), int(cols or rows)
+
+
+def percentile(values, q):
+    """Linear-interpolated q-th percentile (0-100) of values."""
+    ordered = sorted(values)
+    if not ordered:
+        return math.nan
+    position = (len(ordered) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def make_maze(rows, cols, density, seed, index):
+    # A string seed is hashed deterministically, so every worker sees the same maze
+    rng = random.Random(f"{seed}:{rows}x{cols}:{density}:{index}")
+    return maze.generate_maze(rows, cols, int(density * (rows * cols - 2)), rng)
+
+
+def run_maze(task):
+    """Solve one maze with every algorithm; returns one record per algorithm."""
+    rows, cols, density, seed, index, algorithms, measure_memory = task
+    layout = make_maze(rows, cols, density, seed, index)
+    start, goal = layout['start'], layout['goal']
+    records = []
+    for name in algorithms:
+        search = ALGORITHMS[name]
+        grid = maze.Grid(rows, cols, layout['barriers'])
+
+        started = time.perf_counter()
+        visited, _, path = search(start, goal, grid)
+        seconds = time.perf_counter() - started
+
+        peak = math.nan
+        if measure_memory:
+            # Separate run: tracing allocations slows the search down a lot
+            tracemalloc.start()
+            search(start, goal, grid)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        records.append({
+            'algorithm': name, 'rows': rows, 'cols': cols, 'density': density, 'maze': index,
+            'seconds': seconds, 'expanded': len(visited), 'peak_bytes': peak,
+            'path_cost': maze.path_cost(path, grid) if path else math.nan,
+        })
+    return records
+
+
+def run_benchmark(sizes, densities, mazes=10, seed=0, workers=None, algorithms=None, measure_memory=True):
+    """Run every (size, density, maze) task; returns the per-run records."""
+    algorithms = list(algorithms or ALGORITHMS)
+    tasks = [(rows, cols, density, seed, index, algorithms, measure_memory)
+             for rows, cols in sizes for density in densities for index in range(mazes)]
+    if workers == 1:
+        results = map(run_maze, tasks)
+        return [record for records in results for record in records]
+    with ProcessPoolExecutor(workers) as executor:
+        return [record for records in executor.map(run_maze, tasks) for record in records]
+
+
+def summarize(records):
+    """One row per (algorithm, size, density), in first-seen order."""
+    groups = {}
+    for record in records:
+        key = (record['algorithm'], record['rows'], record['cols'], record['density'])
+        groups.setdefault(key, []).append(record)
+
+    rows = []
+    for (algorithm, n_rows, n_cols, density), group in groups.items():
+        millis = [1000 * record['seconds'] for record in group]
+        solved = [record for record in group if not math.isnan(record['path_cost'])]
+        peaks = [record['peak_bytes'] for record in group if not math.isnan(record['peak_bytes'])]
+        rows.append({
+            'algorithm': algorithm, 'rows': n_rows, 'cols': n_cols, 'density': density,
+            'mazes': len(group), 'solved': len(solved),
+            'p50_ms': percentile(millis, 50), 'p95_ms': percentile(millis, 95),
+            'p99_ms': percentile(millis, 99), 'mean_ms': statistics.mean(millis),
+            'mean_expanded': statistics.mean(record['expanded'] for record in group),
+            'peak_kib': max(peaks) / 1024 if peaks else math.nan,
+            'mean_path_cost': statistics.mean(record['path_cost'] for record in solved) if solved else math.nan,
+        })
+    return rows
+
+
+def print_table(summary, out=sys.stdout):
+    print(f"{'algorithm':12} {'size':>9} {'density':>7} {'solved':>7} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'expanded':>10} {'peak KiB':>9} {'cost':>9}", file=out)
+    for row in summary:
+        size = f"{row['rows']}x{row['cols']}"
+        print(f"{row['algorithm']:12} {size:>9} {row['density']:7.2f} {row['solved']:>3}/{row['mazes']:<3} "
+              f"{row['p50_ms']:9.2f} {row['p95_ms']:9.2f} {row['p99_ms']:9.2f} {row['mean_expanded']:10.0f} "
+              f"{row['peak_kib']:9.0f} {row['mean_path_cost']:9.2f}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the maze search algorithms.")
+    parser.add_argument('--sizes', nargs='+', type=parse_size, default=[(100, 100)],
+                        help="grid sizes as N or ROWSxCOLS")
+    parser.add_argument('--densities', nargs='+', type=float, default=[0.2],
+                        help="fraction of cells that are barriers")
+    parser.add_argument('--mazes', type=int, default=10, help="mazes per size and density")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help="processes (1 runs inline)")
+    parser.add_argument('--algorithms', nargs='+', choices=sorted(ALGORITHMS), default=None)
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--json', help="write summary and per-run records as JSON")
+    parser.add_argument('--csv', help="write the summary as CSV")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    records = run_benchmark(args.sizes, args.densities, args.mazes, args.seed,
+                            args.workers, args.algorithms, not args.no_memory)
+    summary = summarize(records)
+    print_table(summary)
+    print(f"\n{len(records)} runs in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            # NaN is not valid JSON; unsolved/unmeasured values become null
+            clean = [{key: (None if isinstance(value, float) and math.isnan(value) else value)
+                      for key, value in row.items()} for row in summary + records]
+            json.dump({'config': {'sizes': args.sizes, 'densities': args.densities, 'mazes': args.mazes,
+                                  'seed': args.seed, 'algorithms': args.algorithms or list(ALGORITHMS)},
+                       'summary': clean[:len(summary)], 'runs': clean[len(summary):]}, f, indent=1)
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(summary)
+
+
+if __name__ == "__main__":
+    main()
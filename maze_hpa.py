@@ -0,0 +1,394 @@
+# maze_hpa.py
+#
+# Hierarchical pathfinding (HPA*) over a maze.Grid.
+#
+# Preprocessing splits the grid into square clusters, places entrance nodes
+# on the cells where paths can cross from one cluster into the next, and
+# stores the distances between the entrances of each cluster. A query then
+# runs A* over that small abstract graph and refines each abstract edge
+# into grid moves with a search confined to one cluster. Paths are valid
+# and complete (a path is found whenever one exists) but, as usual for
+# HPA*, may be slightly longer than optimal.
+
+import heapq
+import json
+import math
+
+from maze import as_grid, octile_distance
+
+DIAGONAL = math.sqrt(2)
+LONG_ENTRANCE = 6  # runs at least this long get a transition at both ends
+
+
+class HPAGraph:
+    """
+    Abstract graph of cluster entrances for one grid.
+
+    Abstract nodes are ordinary node ids. edges[u][v] is the cost from u to
+    v; an edge between two clusters is a single grid move, an edge inside a
+    cluster is the shortest path between them that stays in the cluster.
+    Edit barriers through add_barrier/remove_barrier (or call update())
+    so only the clusters around the edit are reprocessed.
+    """
+
+    def __init__(self, barriers, cluster_size=16):
+        self.grid = as_grid(barriers)
+        self.cluster_size = cluster_size
+        self.clusters_x = -(-self.grid.cols // cluster_size)
+        self.clusters_y = -(-self.grid.rows // cluster_size)
+        self.transitions = {}  # border key -> [(a, b, cost)]
+        self.nodes = {}        # cluster -> set of abstract nodes
+        self.edges = {}        # node -> {neighbor: cost}
+        self._rebuild({(cx, cy) for cx in range(self.clusters_x) for cy in range(self.clusters_y)})
+
+    # ---- Geometry ----
+
+    def cluster_of(self, node):
+        x, y = self.grid.coordinates(node)
+        return x // self.cluster_size, y // self.cluster_size
+
+    def bounds(self, cluster):
+        """(x0, y0, x1, y1) of a cluster, end-exclusive."""
+        cx, cy = cluster
+        k = self.cluster_size
+        return cx * k, cy * k, min((cx + 1) * k, self.grid.cols), min((cy + 1) * k, self.grid.rows)
+
+    def _border_keys(self, cluster):
+        """Keys of every border and corner the cluster touches."""
+        cx, cy = cluster
+        keys = [('h', cx, cy), ('h', cx - 1, cy), ('v', cx, cy), ('v', cx, cy - 1),
+                ('c', cx, cy), ('c', cx - 1, cy), ('c', cx, cy - 1), ('c', cx - 1, cy - 1)]
+        return [key for key in keys if key in self.transitions]
+
+    @staticmethod
+    def _key_clusters(key):
+        kind, cx, cy = key
+        if kind == 'h':
+            return [(cx, cy), (cx + 1, cy)]
+        if kind == 'v':
+            return [(cx, cy), (cx, cy + 1)]
+        return [(cx, cy), (cx + 1, cy), (cx, cy + 1), (cx + 1, cy + 1)]
+
+    # ---- Preprocessing ----
+
+    def _crossings(self, side_a, side_b):
+        """
+        Transitions across one border, given the facing cells on each side
+        in order along it. Every maximal run where both sides are free gets
+        one transition at its middle, or one at each end when it is long;
+        cells of a run are connected along the border on either side. A
+        diagonal crossing is only needed when both cells it cuts past are
+        blocked, since otherwise a straight run already covers it.
+        """
+        blocked = self.grid.blocked
+        transitions = []
+        n = len(side_a)
+        i = 0
+        while i < n:
+            if blocked[side_a[i]] or blocked[side_b[i]]:
+                i += 1
+                continue
+            j = i
+            while j + 1 < n and not blocked[side_a[j + 1]] and not blocked[side_b[j + 1]]:
+                j += 1
+            if j - i + 1 >= LONG_ENTRANCE:
+                transitions += [(side_a[i], side_b[i], 1.0), (side_a[j], side_b[j], 1.0)]
+            else:
+                middle = (i + j) // 2
+                transitions.append((side_a[middle], side_b[middle], 1.0))
+            i = j + 1
+        for i in range(n - 1):
+            a0, a1, b0, b1 = side_a[i], side_a[i + 1], side_b[i], side_b[i + 1]
+            if not blocked[a0] and not blocked[b1] and blocked[b0] and blocked[a1]:
+                transitions.append((a0, b1, DIAGONAL))
+            if not blocked[a1] and not blocked[b0] and blocked[b1] and blocked[a0]:
+                transitions.append((a1, b0, DIAGONAL))
+        return transitions
+
+    def _compute_transitions(self, key):
+        grid = self.grid
+        kind, cx, cy = key
+        k = self.cluster_size
+        if kind == 'h':
+            x0, y0, x1, y1 = self.bounds((cx, cy))
+            side_a = [grid.node_id(x1 - 1, y) for y in range(y0, y1)]
+            side_b = [grid.node_id(x1, y) for y in range(y0, y1)]
+            return self._crossings(side_a, side_b)
+        if kind == 'v':
+            x0, y0, x1, y1 = self.bounds((cx, cy))
+            side_a = [grid.node_id(x, y1 - 1) for x in range(x0, x1)]
+            side_b = [grid.node_id(x, y1) for x in range(x0, x1)]
+            return self._crossings(side_a, side_b)
+        # Corner shared by four clusters: only diagonal moves cross it directly
+        x, y = (cx + 1) * k, (cy + 1) * k
+        top_left, top_right = grid.node_id(x - 1, y - 1), grid.node_id(x, y - 1)
+        bottom_left, bottom_right = grid.node_id(x - 1, y), grid.node_id(x, y)
+        blocked = grid.blocked
+        transitions = []
+        if not blocked[top_left] and not blocked[bottom_right] and blocked[top_right] and blocked[bottom_left]:
+            transitions.append((top_left, bottom_right, DIAGONAL))
+        if not blocked[top_right] and not blocked[bottom_left] and blocked[top_left] and blocked[bottom_right]:
+            transitions.append((top_right, bottom_left, DIAGONAL))
+        return transitions
+
+    def _local_distances(self, source, cluster, targets):
+        """Dijkstra from source confined to cluster; distances to the reachable targets."""
+        x0, y0, x1, y1 = self.bounds(cluster)
+        grid = self.grid
+        cols = grid.cols
+        remaining = set(targets)
+        remaining.discard(source)
+        found = {source: 0.0} if source in targets else {}
+        cost_so_far = {source: 0.0}
+        queue = [(0.0, source)]
+        while queue and remaining:
+            cost, node = heapq.heappop(queue)
+            if cost > cost_so_far[node]:
+                continue
+            if node in remaining:
+                remaining.discard(node)
+                found[node] = cost
+            for neighbor, step_cost in grid.neighbors(node):
+                x, y = neighbor % cols, neighbor // cols
+                if not (x0 <= x < x1 and y0 <= y < y1):
+                    continue
+                new_cost = cost + step_cost
+                if new_cost < cost_so_far.get(neighbor, math.inf):
+                    cost_so_far[neighbor] = new_cost
+                    heapq.heappush(queue, (new_cost, neighbor))
+        return found
+
+    def _rebuild(self, clusters):
+        """Recompute the entrances and edges of the given clusters."""
+        for cluster in clusters:
+            for node in self.nodes.pop(cluster, ()):
+                for neighbor in self.edges.pop(node, {}):
+                    self.edges.get(neighbor, {}).pop(node, None)
+
+        cx_max, cy_max = self.clusters_x - 1, self.clusters_y - 1
+        for cx, cy in clusters:
+            for key in (('h', cx, cy), ('h', cx - 1, cy), ('v', cx, cy), ('v', cx, cy - 1),
+                        ('c', cx, cy), ('c', cx - 1, cy), ('c', cx, cy - 1), ('c', cx - 1, cy - 1)):
+                kind, kx, ky = key
+                if kx < 0 or ky < 0 or (kind != 'v' and kx >= cx_max) or (kind != 'h' and ky >= cy_max):
+                    continue
+                if all(c in clusters for c in self._key_clusters(key)):
+                    self.transitions[key] = self._compute_transitions(key)
+
+        touched = set()
+        for cluster in clusters:
+            nodes = set()
+            for key in self._border_keys(cluster):
+                for a, b, cost in self.transitions[key]:
+                    for node in (a, b):
+                        if self.cluster_of(node) == cluster:
+                            nodes.add(node)
+                    touched.add((a, b, cost))
+            self.nodes[cluster] = nodes
+
+        edges = self.edges
+        for a, b, cost in touched:
+            edges.setdefault(a, {})[b] = cost
+            edges.setdefault(b, {})[a] = cost
+
+        # Entrances are free cells, so in-cluster distances are symmetric and
+        # each pair only needs to be searched once.
+        for cluster in clusters:
+            nodes = sorted(self.nodes[cluster])
+            for node in nodes:
+                edges.setdefault(node, {})
+            for i, node in enumerate(nodes[:-1]):
+                for other, cost in self._local_distances(node, cluster, nodes[i + 1:]).items():
+                    edges[node][other] = cost
+                    edges[other][node] = cost
+
+    def update(self, changed):
+        """Reprocess the clusters around changed cells after barrier edits."""
+        affected = set()
+        cols, rows = self.grid.cols, self.grid.rows
+        k = self.cluster_size
+        for node in changed:
+            x, y = self.grid.coordinates(node)
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    if 0 <= x + dx < cols and 0 <= y + dy < rows:
+                        affected.add(((x + dx) // k, (y + dy) // k))
+        self._rebuild(affected)
+
+    def add_barrier(self, node):
+        self.grid.add_barrier(node)
+        self.update([node])
+
+    def remove_barrier(self, node):
+        self.grid.remove_barrier(node)
+        self.update([node])
+
+    # ---- Queries ----
+
+    def _local_path(self, start, goal, cluster):
+        """A* path from start to goal confined to cluster."""
+        x0, y0, x1, y1 = self.bounds(cluster)
+        grid = self.grid
+        cols = grid.cols
+        goal_x, goal_y = grid.coordinates(goal)
+        came_from = {}
+        cost_so_far = {start: 0.0}
+        queue = [(0.0, start)]
+        while queue:
+            _, node = heapq.heappop(queue)
+            if node == goal:
+                break
+            for neighbor, step_cost in grid.neighbors(node):
+                x, y = neighbor % cols, neighbor // cols
+                if not (x0 <= x < x1 and y0 <= y < y1):
+                    continue
+                new_cost = cost_so_far[node] + step_cost
+                if new_cost < cost_so_far.get(neighbor, math.inf):
+                    cost_so_far[neighbor] = new_cost
+                    came_from[neighbor] = node
+                    heapq.heappush(queue, (new_cost + octile_distance(x - goal_x, y - goal_y), neighbor))
+        path = [goal]
+        while path[-1] != start:
+            path.append(came_from[path[-1]])
+        path.reverse()
+        return path
+
+    def search(self, start, goal):
+        """
+        HPA* query, returning (visited_order, len(visited_order) / 60, path)
+        like the searches in maze.py; visited_order lists the abstract nodes
+        expanded.
+        """
+        grid = self.grid
+        if start == goal:
+            return [start], 1 / 60, [start]
+        if grid.is_blocked(goal):
+            return [], 0, []  # No path found
+
+        goal_cluster = self.cluster_of(goal)
+        # Moves between free cells are symmetric, so distances from the goal
+        # are distances to it.
+        goal_edges = self._local_distances(goal, goal_cluster, self.nodes[goal_cluster])
+
+        # Temporary edges from the start (and from where it can step to)
+        extra = {}
+
+        def connect(node):
+            cluster = self.cluster_of(node)
+            targets = set(self.nodes[cluster])
+            if cluster == goal_cluster:
+                targets.add(goal)
+            extra[node] = self._local_distances(node, cluster, targets)
+
+        connect(start)
+        if grid.is_blocked(start):
+            # A blocked start can still step out of its cell, also across
+            # borders where no transition is placed.
+            start_cluster = self.cluster_of(start)
+            for neighbor, cost in grid.neighbors(start):
+                if self.cluster_of(neighbor) != start_cluster:
+                    connect(neighbor)
+                    extra[start][neighbor] = cost
+
+        goal_x, goal_y = grid.coordinates(goal)
+
+        def heuristic(node):
+            x, y = grid.coordinates(node)
+            return octile_distance(x - goal_x, y - goal_y)
+
+        came_from = {}
+        cost_so_far = {start: 0.0}
+        queue = [(heuristic(start), start)]
+        visited = set()
+        visited_order = []
+        while queue:
+            _, node = heapq.heappop(queue)
+            if node in visited:
+                continue
+            visited.add(node)
+            visited_order.append(node)
+            if node == goal:
+                break
+            neighbors = dict(self.edges.get(node, {}))
+            for neighbor, cost in extra.get(node, {}).items():
+                neighbors[neighbor] = min(neighbors.get(neighbor, math.inf), cost)
+            if node in goal_edges:
+                neighbors[goal] = min(neighbors.get(goal, math.inf), goal_edges[node])
+            for neighbor, cost in neighbors.items():
+                new_cost = cost_so_far[node] + cost
+                if new_cost < cost_so_far.get(neighbor, math.inf):
+                    cost_so_far[neighbor] = new_cost
+                    came_from[neighbor] = node
+                    heapq.heappush(queue, (new_cost + heuristic(neighbor), neighbor))
+
+        if goal not in visited:
+            return visited_order, len(visited_order) / 60, []  # No path found
+
+        abstract = [goal]
+        while abstract[-1] != start:
+            abstract.append(came_from[abstract[-1]])
+        abstract.reverse()
+
+        # Refine: moves between clusters are single steps, the rest local searches
+        path = [start]
+        for u, v in zip(abstract, abstract[1:]):
+            cluster = self.cluster_of(u)
+            if cluster != self.cluster_of(v):
+                path.append(v)
+            else:
+                path += self._local_path(u, v, cluster)[1:]
+        return visited_order, len(visited_order) / 60, path
+
+    # ---- Serialization ----
+
+    def to_dict(self):
+        return {
+            'rows': self.grid.rows,
+            'cols': self.grid.cols,
+            'cluster_size': self.cluster_size,
+            'fingerprint': self.grid.fingerprint(),
+            'transitions': [[kind, cx, cy, transitions]
+                            for (kind, cx, cy), transitions in self.transitions.items()],
+            'edges': [[u, v, cost] for u, neighbors in self.edges.items()
+                      for v, cost in neighbors.items() if u < v],
+        }
+
+    @classmethod
+    def from_dict(cls, data, grid):
+        """Rebuild from to_dict() output; grid must be the grid it was made for."""
+        if data['fingerprint'] != grid.fingerprint():
+            raise ValueError("HPA* data was built for a different grid")
+        graph = cls.__new__(cls)
+        graph.grid = grid
+        graph.cluster_size = data['cluster_size']
+        graph.clusters_x = -(-grid.cols // graph.cluster_size)
+        graph.clusters_y = -(-grid.rows // graph.cluster_size)
+        graph.transitions = {(kind, cx, cy): [tuple(t) for t in transitions]
+                             for kind, cx, cy, transitions in data['transitions']}
+        graph.nodes = {(cx, cy): set() for cx in range(graph.clusters_x) for cy in range(graph.clusters_y)}
+        graph.edges = {}
+        for transitions in graph.transitions.values():
+            for a, b, _ in transitions:
+                graph.nodes[graph.cluster_of(a)].add(a)
+                graph.nodes[graph.cluster_of(b)].add(b)
+        for nodes in graph.nodes.values():
+            for node in nodes:
+                graph.edges[node] = {}
+        for u, v, cost in data['edges']:
+            graph.edges[u][v] = cost
+            graph.edges[v][u] = cost
+        return graph
+
+    def save(self, filename):
+        with open(filename, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, filename, grid):
+        with open(filename) as f:
+            return cls.from_dict(json.load(f), grid)
+
+
+def hpa_search(start, goal, barriers, cluster_size=16):
+    """One-off HPA* query; build an HPAGraph once to reuse the preprocessing."""
+    return HPAGraph(barriers, cluster_size).search(start, goal)
@@ -0,0 +1,116 @@
+# path_cache.py
+#
+# LRU cache of search results for mostly-static maps. Entries are keyed by
+# (map key, start, goal), where the map key is a fingerprint of the barrier
+# layout, so editing a barrier makes old entries unreachable and they age
+# out on their own. The cache can be saved to JSON and loaded again, so a
+# restarted process starts warm.
+
+import atexit
+import json
+import os
+from collections import OrderedDict
+
+
+def _freeze(value):
+    """JSON turns tuples into lists; turn them back so keys hash again."""
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class PathCache:
+    """
+    Bounded LRU map from (map key, start, goal) to a path.
+
+    A path is a list of nodes; an empty list records that goal is
+    unreachable. Memory is bounded both by the number of entries and by the
+    total number of path nodes held. get() counts hits and misses.
+
+    With a filename, the cache is loaded from that file if it exists and
+    saved back to it when the interpreter exits, if anything was added.
+    """
+
+    def __init__(self, max_entries=4096, max_nodes=1_000_000, filename=None):
+        self.max_entries = max_entries
+        self.max_nodes = max_nodes
+        self.filename = filename
+        self.hits = 0
+        self.misses = 0
+        self.nodes = 0
+        self._entries = OrderedDict()
+        self._changed = False
+        if filename is not None:
+            if os.path.exists(filename):
+                self.load(filename)
+                self._changed = False
+            atexit.register(self._save_if_changed)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, map_key, start, goal):
+        """Cached path, or None on a miss."""
+        key = (map_key, start, goal)
+        path = self._entries.get(key)
+        if path is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return path
+
+    def put(self, map_key, start, goal, path):
+        key = (map_key, start, goal)
+        path = list(path)
+        if len(path) > self.max_nodes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.nodes -= len(old)
+        self._entries[key] = path
+        self.nodes += len(path)
+        self._changed = True
+        while len(self._entries) > self.max_entries or self.nodes > self.max_nodes:
+            _, evicted = self._entries.popitem(last=False)
+            self.nodes -= len(evicted)
+
+    def clear(self):
+        self._entries.clear()
+        self.nodes = 0
+        self._changed = True
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self._entries),
+            'nodes': self.nodes,
+        }
+
+    def save(self, filename=None):
+        """Write the entries, least recently used first, to a JSON file."""
+        filename = filename or self.filename
+        entries = [[map_key, start, goal, path]
+                   for (map_key, start, goal), path in self._entries.items()]
+        temp = filename + '.tmp'
+        with open(temp, 'w') as f:
+            json.dump({'entries': entries}, f)
+        os.replace(temp, filename)
+        if filename == self.filename:
+            self._changed = False
+
+    def _save_if_changed(self):
+        if self._changed:
+            self.save()
+
+    def load(self, filename=None):
+        """Add the entries of a file written by save(), keeping the bounds."""
+        filename = filename or self.filename
+        with open(filename) as f:
+            data = json.load(f)
+        for map_key, start, goal, path in data['entries']:
+            self.put(_freeze(map_key), _freeze(start), _freeze(goal),
+                     [_freeze(node) for node in path])
@@ -0,0 +1,64 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from CSP import ShiftAllocation, solve
+
+
+def solve_within(problem, seconds=10, **kwargs):
+    """solve() in a daemon thread, failing instead of hanging the run."""
+    result = {}
+    worker = threading.Thread(target=lambda: result.update(schedule=solve(problem, **kwargs)), daemon=True)
+    worker.start()
+    worker.join(seconds)
+    assert not worker.is_alive(), "solve() did not finish"
+    return result['schedule']
+
+
+def test_flow_integer_penalties():
+    schedule = solve_within(ShiftAllocation(['O1', 'O2'], ['morning'], [0, 1], [3], [[1], [5]]), backend='flow')
+    assert schedule.objective == 7.0
+    assert schedule.shifts.tolist() == [[2], [1]]
+
+
+def test_flow_fractional_penalties_terminate():
+    schedule = solve_within(ShiftAllocation(['O1', 'O2'], ['morning'], [0, 1], [3], [[0.1], [0.5]]), backend='flow')
+    assert schedule.objective == pytest.approx(0.7)
+    assert schedule.shifts.tolist() == [[2], [1]]
+
+
+def test_flow_random_fractional_penalties():
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        n_officers, n_shifts = rng.integers(1, 8), rng.integers(1, 5)
+        min_shifts = rng.integers(0, 3, n_officers)
+        coverage = rng.integers(0, 6, n_shifts)
+        if min_shifts.sum() > coverage.sum():
+            continue
+        penalty = rng.random((n_officers, n_shifts)) * 4 - 1
+        problem = ShiftAllocation(range(n_officers), range(n_shifts), min_shifts, coverage, penalty)
+        x = solve_within(problem, backend='flow').shifts
+        assert (x >= 0).all()
+        assert (x.sum(axis=1) >= min_shifts).all()
+        assert (x.sum(axis=0) == coverage).all()
+
+
+def test_from_csv_fractional_penalties():
+    data = os.path.join(os.path.dirname(__file__), 'data')
+    problem = ShiftAllocation.from_csv(os.path.join(data, 'officers.csv'), os.path.join(data, 'shifts.csv'),
+                                       os.path.join(data, 'penalties.csv'))
+    assert problem.penalty.tolist() == [[0.25, 1.5], [1.75, 0.1], [0.6, 0.65]]
+    schedule = solve_within(problem, backend='flow')
+    assert schedule.shifts.tolist() == [[2, 0], [0, 3], [1, 0]]
+    assert schedule.objective == pytest.approx(2 * 0.25 + 3 * 0.1 + 0.6)
+
+
+def test_from_csv_rejects_non_finite_penalties(tmp_path):
+    data = os.path.join(os.path.dirname(__file__), 'data')
+    penalties = tmp_path / 'penalties.csv'
+    penalties.write_text("officer,shift,penalty\nO1,morning,nan\n")
+    with pytest.raises(ValueError, match="O1, morning"):
+        ShiftAllocation.from_csv(os.path.join(data, 'officers.csv'), os.path.join(data, 'shifts.csv'),
+                                 str(penalties))